@@ -1,9 +1,10 @@
 from IPython.display import display, HTML
 import pandas as pd
-import pygsheets
-import os
 import streamlit as st
 
+from fontes import fonte_configurada
+from formatacao import format_number, formatar_moeda, formatar_peso, parse_numero
+
 # Configuração da página
 st.set_page_config(
     page_title="Exportação (Sertranding)",
@@ -11,39 +12,16 @@ st.set_page_config(
     layout="wide",
 )
 
-# Formatação brasileira de valores
-
-
-def format_number(value, prefix='R$'):
-    if pd.isna(value):
-        return f"{prefix} 0,00"
-    for unit in ['', ' mil']:
-        if value < 1000:
-            return f"{prefix} {value:,.2f}{unit}".replace(",", "X").replace(".", ",").replace("X", ".")
-        value /= 1000
-    return f"{prefix} {value:,.2f} milhões".replace(",", "X").replace(".", ",").replace("X", ".")
-
-# Conexão com Google Sheets
-
+# Fonte dos dados (Google Sheets, CSV/XLSX ou SQLite, ver config.py)
 
-@st.cache_resource
-def conectar_planilha():
-    credenciais = pygsheets.authorize(
-        service_file=os.path.join(os.getcwd(), 'cred.json'))
-    url = "https://docs.google.com/spreadsheets/d/1l7G_4VAQGyN9cfmpsS-_bnjfzSqXRJViZMCZ8z6vXSc/edit#gid=0"
-    arquivo = credenciais.open_by_url(url)
-    aba = arquivo.worksheet_by_title("Sertranding")
-    return aba
-
-
-aba = conectar_planilha()
+fonte = fonte_configurada()
 
 # Carregamento dos dados
 
 
 @st.cache_data(show_spinner=False)
 def carregar_dados():
-    data = aba.get_all_values()
+    data = fonte.ler_grade()
     data = list(
         map(list, zip(*[col for col in zip(*data) if any(cell.strip() for cell in col)])))
     data = [row for row in data if any(cell.strip() for cell in row)]
@@ -59,11 +37,7 @@ def carregar_dados():
     colunas_numericas = ['VALOR NF', 'PESO']
     for col in colunas_numericas:
         if col in df.columns:
-            df[col] = df[col].astype(str) \
-                .str.replace(r'[^\d,.-]', '', regex=True) \
-                .str.replace('.', '', regex=False) \
-                .str.replace(',', '.', regex=False)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            df[col] = parse_numero(df[col])
 
     # Converter datas
     if 'DATA' in df.columns:
@@ -144,21 +118,16 @@ with col3:
             "kg"
         )
 
-# Formata colunas manualmente com separador brasileiro (como texto)
-df_filtrado["PESO"] = df_filtrado["PESO"].apply(
-    lambda x: f"{x:,.0f} kg".replace(
-        ",", "X").replace(".", ",").replace("X", ".")
-)
-
-df_filtrado["VALOR NF"] = df_filtrado["VALOR NF"].apply(
-    lambda x: f"R$ {x:,.0f}".replace(
-        ",", "X").replace(".", ",").replace("X", ".")
-)
+# Formata colunas com separador brasileiro (como texto) só na cópia exibida
+df_exibicao = df_filtrado.assign(**{
+    "PESO": formatar_peso(df_filtrado["PESO"]),
+    "VALOR NF": formatar_moeda(df_filtrado["VALOR NF"], casas=0),
+})
 
 
 # Exibição da Tabela Final com formatação de colunas
 st.dataframe(
-    df_filtrado.reset_index(drop=True),
+    df_exibicao.reset_index(drop=True),
     use_container_width=True,
     hide_index=True,
     column_config={
@@ -179,10 +148,10 @@ def status_com_emoji(status):
         return status
 
 
-df_filtrado["STATUS_EMOJI"] = df_filtrado["STATUS"].apply(status_com_emoji)
+df_exibicao["STATUS_EMOJI"] = df_exibicao["STATUS"].apply(status_com_emoji)
 
 st.data_editor(
-    df_filtrado,
+    df_exibicao,
     use_container_width=True,
     column_config={
         "STATUS_EMOJI": st.column_config.TextColumn("STATUS"),
@@ -205,32 +174,12 @@ st.set_page_config(
 )
 
 
-def format_number(value, prefix='R$'):
-    if pd.isna(value):
-        return f"{prefix} 0,00"
-    for unit in ['', ' mil']:
-        if value < 1000:
-            return f"{prefix} {value:,.2f}{unit}".replace(",", "X").replace(".", ",").replace("X", ".")
-        value /= 1000
-    return f"{prefix} {value:,.2f} milhões".replace(",", "X").replace(".", ",").replace("X", ".")
-
-
-@st.cache_resource
-def conectar_planilha():
-    credenciais = pygsheets.authorize(
-        service_file=os.path.join(os.getcwd(), 'cred.json'))
-    url = "https://docs.google.com/spreadsheets/d/1l7G_4VAQGyN9cfmpsS-_bnjfzSqXRJViZMCZ8z6vXSc/edit#gid=0"
-    arquivo = credenciais.open_by_url(url)
-    aba = arquivo.worksheet_by_title("Sertranding")
-    return aba
-
-
-aba = conectar_planilha()
+fonte = fonte_configurada()
 
 
 @st.cache_data(show_spinner=False)
 def carregar_dados():
-    data = aba.get_all_values()
+    data = fonte.ler_grade()
     data = list(
         map(list, zip(*[col for col in zip(*data) if any(cell.strip() for cell in col)])))
     data = [row for row in data if any(cell.strip() for cell in row)]
@@ -242,11 +191,7 @@ def carregar_dados():
     colunas_numericas = ['VALOR NF', 'PESO']
     for col in colunas_numericas:
         if col in df.columns:
-            df[col] = df[col].astype(str) \
-                .str.replace(r'[^\d,.-]', '', regex=True) \
-                .str.replace('.', '', regex=False) \
-                .str.replace(',', '.', regex=False)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            df[col] = parse_numero(df[col])
 
     # Converter datas
     if 'DATA' in df.columns:
@@ -306,16 +251,11 @@ col3.metric(
     value=format_number(df_filtrado['PESO'].sum(), "kg")
 )
 
-# Formata colunas como texto com separador brasileiro
-df_filtrado["PESO"] = df_filtrado["PESO"].apply(
-    lambda x: f"{x:,.0f} kg".replace(
-        ",", "X").replace(".", ",").replace("X", ".")
-)
-
-df_filtrado["VALOR NF"] = df_filtrado["VALOR NF"].apply(
-    lambda x: f"R$ {x:,.2f}".replace(
-        ",", "X").replace(".", ",").replace("X", ".")
-)
+# Formata colunas como texto com separador brasileiro só na cópia exibida
+df_exibicao = df_filtrado.assign(**{
+    "PESO": formatar_peso(df_filtrado["PESO"]),
+    "VALOR NF": formatar_moeda(df_filtrado["VALOR NF"]),
+})
 
 # Função para status com emoji
 
@@ -332,11 +272,11 @@ def status_com_emoji(status):
         return status
 
 
-df_filtrado["STATUS_EMOJI"] = df_filtrado["STATUS"].apply(status_com_emoji)
+df_exibicao["STATUS_EMOJI"] = df_exibicao["STATUS"].apply(status_com_emoji)
 
 # Exibe tabela com status + emojis, formato texto e sem índice
 st.dataframe(
-    df_filtrado.reset_index(drop=True)[
+    df_exibicao.reset_index(drop=True)[
         # ajuste colunas conforme necessidade
         ['DATA', 'STATUS_EMOJI', 'VALOR NF', 'PESO', 'IMO']
     ],
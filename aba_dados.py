@@ -1,8 +1,10 @@
-import pandas as pd
-import pygsheets
-import streamlit.components.v1 as components
 import streamlit as st
 
+import dados
+import escrita
+import fontes
+import qualidade
+
 st.markdown(
     "[📄 Abrir Planilha Online](https://docs.google.com/spreadsheets/d/1l7G_4VAQGyN9cfmpsS-_bnjfzSqXRJViZMCZ8z6vXSc/edit?usp=sharing)",
     unsafe_allow_html=True
@@ -20,3 +22,27 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+try:
+    df = dados.carregar_dados()
+except Exception:
+    st.error("❌ Não foi possível acessar a planilha e não há uma cópia local dos dados. "
+             "Tente novamente em alguns minutos.")
+    st.stop()
+
+aba_novo, aba_status, aba_qualidade = st.tabs(
+    ["➕ Novo lançamento", "✏️ Alterar STATUS", "🩺 Qualidade dos dados"])
+gravavel = fontes.fonte_configurada().gravavel
+with aba_novo:
+    if gravavel:
+        escrita.situacao_fila()
+        escrita.formulario_lancamento(df)
+    else:
+        st.info("A fonte de dados configurada é só leitura.")
+with aba_status:
+    if gravavel:
+        escrita.edicao_status(df)
+    else:
+        st.info("A fonte de dados configurada é só leitura.")
+with aba_qualidade:
+    qualidade.painel_qualidade(df)
@@ -0,0 +1,146 @@
+import argparse
+import datetime
+import importlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Aquecimento do processo na partida do servidor (servidor.py): importa os
+# módulos pesados das páginas, autentica na planilha, carrega os dados
+# (snapshot local ou, sem ele, a planilha inteira) e monta as estruturas da
+# primeira página. Sem isso quem paga tudo é o primeiro visitante depois de
+# um deploy ou de uma instância nova.
+#
+# Cada passo entra no registro como etapa partida_<passo> (painel de admin e
+# Prometheus). Para ver o perfil da partida num processo novo:
+#
+#   python aquecimento.py --pagina exportacao.py
+
+# Módulos das páginas; o pygsheets entra no passo conectar
+MODULOS = ['streamlit', 'numpy', 'pandas', 'pyarrow.compute', 'pyarrow.parquet', 'openpyxl',
+           'instrumentacao', 'dados', 'busca', 'indice', 'metricas', 'pendentes', 'tabela',
+           'series', 'historico', 'exportar', 'escrita', 'qualidade', 'atualizador']
+
+
+def _medir(perfil, passo, detalhe, funcao):
+    inicio = time.perf_counter()
+    funcao()
+    perfil.append((passo, detalhe, time.perf_counter() - inicio))
+
+
+def _importar(perfil):
+    for nome in MODULOS:
+        _medir(perfil, 'importar', nome, lambda: importlib.import_module(nome))
+
+
+def _conectar(perfil):
+    import fontes
+
+    # Com snapshot a página nem toca na planilha, mas o primeiro sync e os
+    # lançamentos vão precisar da conexão
+    if isinstance(fontes.fonte_configurada(), fontes.FonteGoogleSheets):
+        fontes.conectar_planilha()
+
+
+def _carregar(perfil):
+    import dados
+
+    dados.carregar_dados()
+
+
+def _estruturas(perfil):
+    import pandas as pd
+
+    import busca
+    import dados
+    import pendentes
+    import series
+    from indice import IndiceDatas, IndiceFiltros
+    from metricas import CuboMetricas
+
+    df = dados.cache_dados().df
+    if df is None:
+        return
+    # Mesmos nomes de dados.derivado usados pelas páginas
+    _medir(perfil, 'estruturas', 'filtros', lambda: dados.derivado(df, 'filtros', IndiceFiltros))
+    _medir(perfil, 'estruturas', 'datas', lambda: dados.derivado(df, 'datas', IndiceDatas))
+    _medir(perfil, 'estruturas', 'cubo', lambda: dados.derivado(df, 'cubo', CuboMetricas))
+    _medir(perfil, 'estruturas', 'busca', lambda: busca.indice_busca(df))
+    _medir(perfil, 'estruturas', 'series', lambda: series.series_pagina(df))
+    # Mesmo "hoje" da página Sertranding
+    hoje = pd.Timestamp(datetime.datetime.now().date())
+    _medir(perfil, 'estruturas', 'pendentes', lambda: pendentes.pendentes_atuais(df, hoje))
+
+
+def _atualizador(perfil):
+    import atualizador
+
+    atualizador.iniciar_atualizador()
+
+
+PASSOS = [
+    ('importar', _importar),
+    ('conectar', _conectar),
+    ('dados', _carregar),
+    ('estruturas', _estruturas),
+    ('atualizador', _atualizador),
+]
+
+
+def aquecer():
+    """Roda os passos da partida em ordem; devolve o perfil [(passo, detalhe, segundos)].
+
+    Uma falha (planilha fora do ar, sem snapshot...) fica no log e não impede
+    os passos seguintes: a página tenta de novo no primeiro acesso.
+    """
+    perfil = []
+    for passo, funcao in PASSOS:
+        posicao = len(perfil)
+        inicio = time.perf_counter()
+        try:
+            funcao(perfil)
+        except Exception:
+            logger.exception("Aquecimento: falha no passo %s", passo)
+        perfil.insert(posicao, (passo, None, time.perf_counter() - inicio))
+
+    import instrumentacao
+
+    registro = instrumentacao.registro()
+    for passo, detalhe, segundos in perfil:
+        if detalhe is None:
+            registro.registrar(f'partida_{passo}', segundos)
+    return perfil
+
+
+def imprimir(perfil):
+    for passo, detalhe, segundos in perfil:
+        nome = passo if detalhe is None else f"    {detalhe}"
+        print(f"{nome:<24}{segundos * 1000:9.0f} ms")
+    total = sum(segundos for _, detalhe, segundos in perfil if detalhe is None)
+    print(f"{'total':<24}{total * 1000:9.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil da partida do servidor Sertranding")
+    parser.add_argument('--pagina', help="depois do aquecimento, executa a página uma vez "
+                                         "(ex.: exportacao.py) e mede a primeira execução")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Fora do `streamlit run` os caches avisam a cada chamada
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    perfil = aquecer()
+
+    if args.pagina:
+        from streamlit.testing.v1 import AppTest
+
+        pagina = AppTest.from_file(args.pagina, default_timeout=600)
+        _medir(perfil, f'pagina {args.pagina}', None, pagina.run)
+        if pagina.exception:
+            print(f"Erro na página: {pagina.exception}")
+    imprimir(perfil)
+
+
+if __name__ == '__main__':
+    main()
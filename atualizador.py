@@ -0,0 +1,75 @@
+import logging
+import random
+import threading
+import time
+
+import streamlit as st
+
+import config
+import dados
+
+logger = logging.getLogger(__name__)
+
+# Um único worker por processo busca a planilha no intervalo configurado e
+# publica no cache compartilhado; as sessões abertas só comparam a versão do
+# cache com a que exibiram e se reexecutam quando ela muda. Assim o número de
+# chamadas à API não depende de quantos usuários estão na página.
+
+
+class Atualizador:
+    def __init__(self, intervalo, intervalo_maximo):
+        self.intervalo = intervalo
+        self.intervalo_maximo = intervalo_maximo
+        self.falhas = 0
+        self.ultima_busca = None
+        self.ultimo_erro = None
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._rodar, name="sertranding-poller",
+                                        daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+
+    def espera(self):
+        # Backoff exponencial com jitter enquanto a planilha estiver falhando
+        espera = min(self.intervalo * 2 ** self.falhas, self.intervalo_maximo)
+        return espera * random.uniform(0.9, 1.1)
+
+    def primeira_espera(self):
+        # Dados vindos de um snapshot antigo (ou nenhum dado) são buscados já;
+        # dados frescos, só quando vencerem
+        cache = dados.cache_dados()
+        return min(max(0.0, cache.carregado_em + config.CACHE_TTL - time.time()), self.intervalo)
+
+    def _rodar(self):
+        espera = self.primeira_espera()
+        while not self._parar.wait(espera):
+            try:
+                dados.atualizar_dados()
+            except Exception as erro:
+                self.falhas += 1
+                self.ultimo_erro = erro
+                logger.exception("Falha ao buscar a planilha (%d seguidas)", self.falhas)
+            else:
+                self.falhas = 0
+                self.ultimo_erro = None
+                self.ultima_busca = time.time()
+            espera = self.espera()
+
+
+@st.cache_resource
+def iniciar_atualizador():
+    if not config.POLL_ATIVO:
+        return None
+    return Atualizador(config.POLL_INTERVALO, config.POLL_INTERVALO_MAXIMO).iniciar()
+
+
+@st.fragment(run_every=config.POLL_VERIFICAR_SESSAO)
+def aviso_nova_versao(versao):
+    """Reexecuta a página da sessão quando o worker publica uma versão nova dos dados."""
+    if dados.cache_dados().versao != versao:
+        st.rerun()
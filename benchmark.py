@@ -0,0 +1,241 @@
+import argparse
+import csv
+import datetime
+import logging
+import os
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+import dados
+from fontes import FonteArquivo, GradeColunar, letra_coluna
+from formatacao import formatar_moeda, formatar_peso
+from indice import IndiceDatas, IndiceFiltros
+from instrumentacao import relatorio_memoria
+from metricas import CuboMetricas
+from pendentes import calcular_pendentes
+from qualidade import problemas_celulas, relatorio
+from series import SeriesTemporais
+from tabela import OrdemColunas, formatar_pagina
+
+# Benchmark das etapas da página Sertranding sobre planilhas sintéticas.
+#
+#   python benchmark.py --linhas 1000 10000 100000 1000000
+#
+# Cada etapa é cronometrada separadamente (menor tempo de --repeticoes) e o
+# resultado é acrescentado em --saida (por padrão em .cache/) junto com o commit
+# atual, para comparar versões. A etapa fonte_ler lê a planilha gerada de um CSV
+# com FonteArquivo, como SERTRANDING_FONTE=csv; --csv guarda esse arquivo.
+
+COLUNAS = ['STATUS', 'DATA', 'Nº DI', 'PROCESSO', 'PO', 'TERMINAL', 'TIPO DE CARGA',
+           'Nº CONTAINER', 'PRODUTO', 'QTD[VOLUME]', 'MOTORISTA', 'PESO', 'IMO', 'DAST',
+           'NOTA FISCAL', 'VALOR NF']
+
+# Distribuições aproximadas da planilha real
+STATUS = {'CONCLUÍDO': 0.6, 'AGUARDANDO': 0.28, 'CANCELADO': 0.08, 'aguardando': 0.02, '': 0.02}
+IMO = {'NÃO': 0.83, 'SIM': 0.15, '': 0.02}
+TIPO_DE_CARGA = {'CONTAINER 40': 0.4, 'CONTAINER 20': 0.3, 'CARGA SOLTA': 0.15,
+                 'GRANEL': 0.1, 'REEFER': 0.05}
+TERMINAIS = ['TECON', 'SANTOS BRASIL', 'DPW', 'BTP', 'ECOPORTO']
+PRODUTOS = ['CAFÉ', 'AÇÚCAR', 'SOJA', 'ALGODÃO', 'CELULOSE', 'PEÇAS', 'QUÍMICOS']
+
+# Uma linha em branco a cada LINHAS_VAZIAS e uma coluna em branco entre PO e TERMINAL
+LINHAS_VAZIAS = 50
+COLUNA_VAZIA = 5
+
+
+def _sortear(gerador, n, pesos):
+    valores = np.array(list(pesos), dtype=object)
+    p = np.array(list(pesos.values()))
+    return valores[gerador.choice(len(valores), size=n, p=p / p.sum())]
+
+
+def _texto(prefixo, numeros, largura):
+    return (prefixo + pd.Series(numeros).astype(str).str.zfill(largura)).to_numpy(dtype=object)
+
+
+def _com_vazios(gerador, valores, fracao):
+    valores = valores.astype(object)
+    valores[gerador.random(len(valores)) < fracao] = ''
+    return valores
+
+
+def gerar_grade(n, semente=0):
+    """Planilha sintética com n lançamentos, no formato devolvido por FonteDados.ler_colunas."""
+    g = np.random.default_rng(semente)
+    hoje = pd.Timestamp(datetime.date.today())
+    datas = hoje + pd.to_timedelta(g.integers(-3 * 365, 60, n), unit='D')
+    colunas = {
+        'STATUS': _sortear(g, n, STATUS),
+        'DATA': _com_vazios(g, pd.Series(datas).dt.strftime('%d/%m/%Y').to_numpy(), 0.01),
+        'Nº DI': _texto('DI', g.integers(0, 10 ** 8, n), 8),
+        'PROCESSO': _texto('PRC-', np.arange(1, n + 1), 7),
+        'PO': _texto('PO', g.integers(0, n // 4 + 1, n), 6),
+        'TERMINAL': _sortear(g, n, dict.fromkeys(TERMINAIS, 1)),
+        'TIPO DE CARGA': _sortear(g, n, TIPO_DE_CARGA),
+        'Nº CONTAINER': _texto('MSCU', g.integers(0, 10 ** 7, n), 7),
+        'PRODUTO': _sortear(g, n, dict.fromkeys(PRODUTOS, 1)),
+        'QTD[VOLUME]': g.integers(1, 60, n).astype(str).astype(object),
+        'MOTORISTA': _texto('MOTORISTA ', g.integers(0, 300, n), 3),
+        'PESO': _com_vazios(g, formatar_peso(
+            pd.Series(g.lognormal(9, 1, n).round())).to_numpy(dtype=object), 0.02),
+        'IMO': _sortear(g, n, IMO),
+        'DAST': _com_vazios(g, _texto('', g.integers(0, 10 ** 6, n), 6), 0.5),
+        'NOTA FISCAL': _texto('', g.integers(1, 10 ** 6, n), 6),
+        'VALOR NF': _com_vazios(g, formatar_moeda(
+            pd.Series(g.lognormal(11, 1.2, n))).to_numpy(dtype=object), 0.02),
+    }
+
+    # Linhas em branco intercaladas, como na aba de verdade
+    total = n + n // LINHAS_VAZIAS
+    cheias = np.ones(total, dtype=bool)
+    cheias[LINHAS_VAZIAS::LINHAS_VAZIAS + 1] = False
+    valores = []
+    for nome in COLUNAS:
+        coluna = np.full(total, '', dtype=object)
+        coluna[cheias] = colunas[nome]
+        valores.append(coluna.tolist())
+
+    letras = [letra_coluna(j + 1 + (j >= COLUNA_VAZIA)) for j in range(len(COLUNAS))]
+    return GradeColunar(1, list(COLUNAS), letras, valores)
+
+
+def salvar_csv(grade, caminho):
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        cabecalho = list(grade.nomes)
+        cabecalho.insert(COLUNA_VAZIA, '')
+        escritor.writerow(cabecalho)
+        for linha in zip(*grade.valores):
+            linha = list(linha)
+            linha.insert(COLUNA_VAZIA, '')
+            escritor.writerow(linha)
+
+
+def cronometrar(funcao, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def medir(grade, repeticoes=3, caminho_csv=None):
+    """({etapa: segundos}, memória do df em MB) para uma planilha já gerada.
+
+    caminho_csv: a planilha já gravada por salvar_csv; sem ele, vai para um temporário.
+    """
+    tempos = {}
+
+    def etapa(nome, funcao):
+        tempos[nome], resultado = cronometrar(funcao, repeticoes)
+        return resultado
+
+    with tempfile.TemporaryDirectory() as pasta:
+        if caminho_csv is None:
+            caminho_csv = os.path.join(pasta, 'planilha.csv')
+            salvar_csv(grade, caminho_csv)
+        fonte = FonteArquivo(caminho_csv)
+        etapa('fonte_ler', lambda: fonte.ler_colunas(config.COLUNAS))
+
+    bruto = etapa('montar_bruto', lambda: dados.montar_bruto(grade))
+    df = etapa('tipar', lambda: dados.tipar(bruto))
+    celulas = etapa('qualidade', lambda: problemas_celulas(bruto, df))
+    etapa('qualidade_relatorio', lambda: relatorio(df, celulas))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'snapshot.parquet')
+        etapa('snapshot_gravar', lambda: dados.salvar_snapshot(df, caminho))
+        etapa('snapshot_ler', lambda: dados.ler_snapshot(caminho))
+
+    indice = etapa('indice', lambda: IndiceFiltros(df))
+    datas = etapa('indice_datas', lambda: IndiceDatas(df))
+    filtros = {
+        'STATUS': ['AGUARDANDO'],
+        'IMO': [],
+        'TIPO DE CARGA': [],
+    }
+    meses = list(datas.meses[-1:])
+    linhas = etapa('filtros', lambda: indice.linhas(filtros, datas.selecionar(meses)))
+    df_filtrado = df.iloc[linhas]
+
+    cubo = etapa('cubo', lambda: CuboMetricas(df))
+    etapa('kpis', lambda: cubo.kpis(filtros, meses))
+
+    series = etapa('series', lambda: SeriesTemporais.de_df(df))
+    etapa('series_grafico', lambda: series.serie('TERMINAL', 'VALOR NF'))
+
+    hoje = pd.Timestamp(datetime.date.today())
+    etapa('pendentes', lambda: calcular_pendentes(df, hoje))
+    etapa('pendentes_filtrado', lambda: calcular_pendentes(df_filtrado, hoje))
+    etapa('pendentes_janela', lambda: calcular_pendentes(
+        df.iloc[datas.entre(hoje, hoje + pd.Timedelta(days=8))], hoje))
+
+    etapa('tabela_ordem', lambda: OrdemColunas(df).ordem('VALOR NF', True))
+    etapa('tabela_pagina', lambda: formatar_pagina(df.iloc[:100]))
+    etapa('tabela_formatar_tudo', lambda: formatar_pagina(df))
+
+    memoria = df.memory_usage(deep=True).sum() / 2 ** 20
+    return tempos, memoria
+
+
+def versao_codigo():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecida'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das etapas da página Sertranding")
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', default=os.path.join('.cache', 'benchmark_resultados.csv'))
+    parser.add_argument('--csv', help="grava a planilha gerada (a maior) neste arquivo")
+    parser.add_argument('--memoria', action='store_true',
+                        help="mostra a memória por coluna do df da maior planilha")
+    args = parser.parse_args()
+
+    # Fora do `streamlit run` os caches avisam a cada chamada
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+    quando = datetime.datetime.now().isoformat(timespec='seconds')
+    versao = versao_codigo()
+    registros = []
+    for n in args.linhas:
+        inicio = time.perf_counter()
+        grade = gerar_grade(n, args.semente)
+        print(f"\n{n} linhas (gerada em {time.perf_counter() - inicio:.1f}s)")
+        # A planilha de cada tamanho passa pelo arquivo; fica a última (a maior)
+        if args.csv:
+            salvar_csv(grade, args.csv)
+        tempos, memoria = medir(grade, args.repeticoes, args.csv)
+        for etapa, segundos in tempos.items():
+            print(f"  {etapa:<22}{segundos * 1000:>10.1f} ms")
+            registros.append([quando, versao, n, etapa, f"{segundos:.6f}", f"{memoria:.1f}"])
+        print(f"  {'memória do df':<22}{memoria:>10.1f} MB")
+    if args.memoria:
+        print()
+        print(relatorio_memoria(dados.tipar(dados.montar_bruto(grade))).to_string(
+            float_format=lambda v: f"{v:.2f}"))
+
+    os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+    novo = not os.path.exists(args.saida)
+    with open(args.saida, 'a', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        if novo:
+            escritor.writerow(['quando', 'versao', 'linhas', 'etapa', 'segundos', 'memoria_mb'])
+        escritor.writerows(registros)
+    print(f"\nResultados acrescentados em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import dados
+
+# Busca textual da página Sertranding. Os campos de identificação de cada
+# linha são normalizados (sem acento, maiúsculas) e juntados num texto só;
+# cada trigrama (3 bytes seguidos) desse texto aponta para as linhas onde
+# aparece. Uma consulta cruza as listas dos trigramas de cada palavra (busca
+# binária nos arrays ordenados) e só confere o texto das poucas candidatas.
+# Palavras com menos de 3 letras caem numa varredura vetorizada (Arrow).
+#
+# O índice é montado uma vez por versão dos dados; depois de uma
+# sincronização incremental só as linhas alteradas são reindexadas.
+
+CAMPOS = ['PROCESSO', 'Nº CONTAINER', 'Nº DI', 'NOTA FISCAL', 'PO', 'MOTORISTA']
+
+# Separa os campos no texto da linha; trigramas com ele não são indexados
+SEPARADOR = '\x1f'
+_SEP = ord(SEPARADOR)
+
+# Cada entrada do índice é um int64: trigrama nos bits altos, rótulo da linha nos 32 baixos
+_BITS = 32
+_ROTULO = (1 << _BITS) - 1
+
+
+def normalizar(textos):
+    """Array Arrow de texto -> sem acentos e em maiúsculas ("Concluído" -> "CONCLUIDO")."""
+    decomposto = pc.utf8_normalize(textos, 'NFKD')
+    return pc.utf8_upper(pc.replace_substring_regex(decomposto, r'\p{Mn}', ''))
+
+
+def texto_linhas(df):
+    campos = []
+    for campo in CAMPOS:
+        if campo in df.columns:
+            valores = pa.array(df[campo].astype(str), pa.string(), from_pandas=True)
+            if isinstance(valores, pa.ChunkedArray):
+                valores = valores.combine_chunks()
+            campos.append(pc.fill_null(valores, ''))
+    if not campos:
+        return pa.array([''] * len(df), pa.string())
+    return normalizar(pc.binary_join_element_wise(*campos, SEPARADOR))
+
+
+def _bytes(textos):
+    """(bytes concatenados, offsets a partir de 0) de um array Arrow de texto."""
+    offsets = np.frombuffer(textos.buffers()[1], dtype=np.int32)[
+        textos.offset:textos.offset + len(textos) + 1]
+    dados_texto = textos.buffers()[2]
+    if dados_texto is None:
+        return np.zeros(0, np.uint8), offsets - offsets[0]
+    conteudo = np.frombuffer(dados_texto, dtype=np.uint8)[offsets[0]:offsets[-1]]
+    return conteudo, offsets - offsets[0]
+
+
+def _codigos(conteudo):
+    c = conteudo.astype(np.int64)
+    return (c[:-2] << 16) | (c[1:-1] << 8) | c[2:]
+
+
+def trigramas(textos, rotulos):
+    """Chaves (trigrama << 32 | rótulo da linha) únicas e ordenadas; rotulos crescentes."""
+    conteudo, offsets = _bytes(textos)
+    if len(conteudo) < 3:
+        return np.zeros(0, np.int64)
+    linha = np.repeat(np.arange(len(textos), dtype=np.int64), np.diff(offsets))
+    codigos = _codigos(conteudo)
+    validos = (linha[:-2] == linha[2:]) & (conteudo[:-2] != _SEP) \
+        & (conteudo[1:-1] != _SEP) & (conteudo[2:] != _SEP)
+    # sort + descarte dos repetidos (o np.unique por hash é bem mais lento aqui)
+    chaves = np.sort((codigos[validos] << _BITS) | linha[:-2][validos])
+    chaves = chaves[np.r_[True, chaves[1:] != chaves[:-1]]]
+    # Posição -> rótulo preserva a ordem, porque os rótulos são crescentes
+    return (chaves & ~_ROTULO) | rotulos[chaves & _ROTULO]
+
+
+class IndiceBusca:
+    def __init__(self, df, texto=None, chaves=None):
+        # Rótulos (LINHA da aba) crescentes permitem reaproveitar o índice após um sync
+        indice = df.index
+        self.rotulos = (indice.to_numpy(dtype=np.int64) if indice.is_monotonic_increasing
+                        and indice.is_unique and pd.api.types.is_integer_dtype(indice)
+                        else np.arange(len(df), dtype=np.int64))
+        self.texto = texto_linhas(df) if texto is None else texto
+        self.chaves = trigramas(self.texto, self.rotulos) if chaves is None else chaves
+
+    def atualizar(self, df, alteradas):
+        """Novo índice para df, reindexando só as linhas (rótulos) alteradas."""
+        novo_rotulos = df.index
+        if not (novo_rotulos.is_monotonic_increasing and novo_rotulos.is_unique
+                and pd.api.types.is_integer_dtype(novo_rotulos)):
+            return IndiceBusca(df)
+        novo_rotulos = novo_rotulos.to_numpy(dtype=np.int64)
+        alteradas = np.asarray(alteradas, dtype=np.int64)
+
+        mudou = np.isin(novo_rotulos, alteradas)
+        texto_novas = texto_linhas(df.iloc[np.flatnonzero(mudou)])
+        novas = trigramas(texto_novas, novo_rotulos[mudou])
+
+        # Chaves antigas das linhas que continuam iguais, com as das alteradas intercaladas
+        manter = ~np.isin(self.chaves & _ROTULO, alteradas, kind='table')
+        antigas = self.chaves[manter]
+        chaves = np.insert(antigas, np.searchsorted(antigas, novas), novas)
+
+        # Texto por posição do df novo: das linhas antigas ou das reindexadas
+        origem = np.where(mudou, len(self.rotulos) + np.cumsum(mudou) - 1,
+                          np.searchsorted(self.rotulos, novo_rotulos))
+        texto = pa.concat_arrays([self.texto, texto_novas]).take(pa.array(origem))
+        return IndiceBusca(df, texto, chaves)
+
+    def _candidatas(self, palavra):
+        conteudo = np.frombuffer(palavra.encode('utf-8'), dtype=np.uint8)
+        resultado = None
+        for codigo in np.unique(_codigos(conteudo)):
+            inicio, fim = np.searchsorted(self.chaves, [codigo << _BITS, (codigo + 1) << _BITS])
+            lista = self.chaves[inicio:fim] & _ROTULO
+            resultado = lista if resultado is None else np.intersect1d(
+                resultado, lista, assume_unique=True)
+            if not len(resultado):
+                break
+        return np.searchsorted(self.rotulos, resultado)
+
+    def buscar(self, consulta):
+        """Posições (iloc) das linhas com todas as palavras da consulta; None se vazia."""
+        palavras = normalizar(pa.array(consulta.split(), pa.string())).to_pylist()
+        if not palavras:
+            return None
+        posicoes = None
+        for palavra in sorted(palavras, key=len, reverse=True):
+            if len(palavra.encode('utf-8')) >= 3:
+                candidatas = self._candidatas(palavra)
+            else:
+                candidatas = np.arange(len(self.rotulos)) if posicoes is None else posicoes
+            if posicoes is not None:
+                candidatas = (posicoes if len(posicoes) < len(candidatas)
+                              else np.intersect1d(candidatas, posicoes, assume_unique=True))
+            # Trigramas em comum não garantem a palavra inteira: confere o texto
+            achou = pc.match_substring(self.texto.take(pa.array(candidatas, pa.int64())), palavra)
+            posicoes = candidatas[achou.to_numpy(zero_copy_only=False)]
+            if not len(posicoes):
+                break
+        return posicoes
+
+
+def indice_busca(df):
+    """Índice da versão atual dos dados, atualizado a partir do anterior depois de um sync."""
+    def construir(df):
+        anterior, alteradas = dados.derivado_anterior('busca')
+        if anterior is not None:
+            return anterior.atualizar(df, alteradas)
+        return IndiceBusca(df)
+
+    return dados.derivado(df, 'busca', construir)
+
+
+def contem(df, consulta):
+    """Máscara das linhas de df com todas as palavras (varredura, para frames pequenos)."""
+    texto = texto_linhas(df)
+    selecao = np.ones(len(df), dtype=bool)
+    for palavra in normalizar(pa.array(consulta.split(), pa.string())).to_pylist():
+        selecao &= pc.match_substring(texto, palavra).to_numpy(zero_copy_only=False)
+    return selecao
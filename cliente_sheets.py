@@ -0,0 +1,144 @@
+import logging
+import random
+import socket
+import threading
+import time
+
+from instrumentacao import etapa, registro
+
+logger = logging.getLogger(__name__)
+
+# Cliente em volta da aba do pygsheets usado por FonteGoogleSheets: junta
+# leituras idênticas simultâneas numa só chamada, respeita um limite de
+# requisições por minuto (balde de tokens) e tenta de novo com backoff
+# exponencial e jitter quando a API devolve erro de cota ou de servidor.
+# As escritas (escrita.py, historico.py) passam pelo mesmo balde; um append ou
+# uma remoção de linhas só é repetido quando a API recusou a chamada por cota
+# (429), para não duplicar nem apagar linhas a mais.
+
+STATUS_TEMPORARIOS = {429, 500, 502, 503, 504}
+
+
+def _status_http(erro):
+    status = getattr(getattr(erro, 'resp', None), 'status', None)
+    return None if status is None else int(status)
+
+
+def erro_temporario(erro):
+    status = _status_http(erro)
+    if status is not None:
+        return status in STATUS_TEMPORARIOS
+    return isinstance(erro, (ConnectionError, TimeoutError, socket.timeout))
+
+
+def erro_de_cota(erro):
+    return _status_http(erro) == 429
+
+
+class BaldeTokens:
+    def __init__(self, por_minuto, capacidade=None):
+        self.taxa = por_minuto / 60
+        self.capacidade = capacidade or max(por_minuto // 6, 1)
+        self.tokens = float(self.capacidade)
+        self.atualizado = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consumir(self):
+        while True:
+            with self.lock:
+                agora = time.monotonic()
+                self.tokens = min(self.capacidade,
+                                  self.tokens + (agora - self.atualizado) * self.taxa)
+                self.atualizado = agora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.taxa
+            time.sleep(espera)
+
+
+class _Chamada:
+    def __init__(self):
+        self.pronta = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class ClienteSheets:
+    def __init__(self, conectar, por_minuto=50, tentativas=5, espera_base=1.0):
+        # conectar() devolve a aba (pygsheets.Worksheet); também passa pelo retry
+        self._conectar = conectar
+        self.balde = BaldeTokens(por_minuto)
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+
+    def _executar(self, funcao, repetir=erro_temporario):
+        for tentativa in range(self.tentativas):
+            with etapa('sheets_espera_cota'):
+                self.balde.consumir()
+            try:
+                aba = self._conectar()
+                with etapa('sheets_api'):
+                    return funcao(aba)
+            except Exception as erro:
+                if tentativa == self.tentativas - 1 or not repetir(erro):
+                    raise
+                espera = self.espera_base * 2 ** tentativa * random.uniform(0.5, 1.5)
+                logger.warning("Google Sheets: %s; nova tentativa em %.1fs", erro, espera)
+                time.sleep(espera)
+
+    def _unica(self, chave, funcao):
+        """Executa funcao uma vez para todas as chamadas simultâneas com a mesma chave."""
+        with self._lock:
+            chamada = self._em_andamento.get(chave)
+            dono = chamada is None
+            if dono:
+                chamada = self._em_andamento[chave] = _Chamada()
+        registro().cache_usado('sheets_leitura_compartilhada', not dono)
+        if not dono:
+            chamada.pronta.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = self._executar(funcao)
+            return chamada.resultado
+        except Exception as erro:
+            chamada.erro = erro
+            raise
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+            chamada.pronta.set()
+
+    def get_all_values(self):
+        return self._unica(('get_all_values',), lambda aba: aba.get_all_values())
+
+    def get_values_batch(self, faixas, majdim='ROWS'):
+        return self._unica(('get_values_batch', tuple(faixas), majdim),
+                           lambda aba: aba.get_values_batch(faixas, majdim=majdim))
+
+    def update_values_batch(self, faixas, valores):
+        # Regravar os mesmos valores é idempotente: pode repetir em qualquer erro temporário
+        return self._executar(lambda aba: aba.update_values_batch(faixas, valores))
+
+    def append_table(self, valores, inicio):
+        return self._executar(lambda aba: aba.append_table(valores, start=inicio),
+                              repetir=erro_de_cota)
+
+    def apagar_linhas(self, faixas):
+        """faixas: [(inicio, fim)] da aba, apagadas na ordem dada numa só batchUpdate."""
+        def apagar(aba):
+            requisicoes = [{
+                "deleteDimension": {
+                    "range": {"sheetId": aba.id, "dimension": "ROWS",
+                              "startIndex": inicio - 1, "endIndex": fim},
+                }
+            } for inicio, fim in faixas]
+            return aba.spreadsheet.custom_request(requisicoes, fields="replies")
+
+        # Como o append: repetir depois de um erro de servidor apagaria outras linhas
+        return self._executar(apagar, repetir=erro_de_cota)
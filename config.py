@@ -0,0 +1,80 @@
+import os
+
+# Configurações lidas do ambiente (com valores padrão para rodar localmente)
+
+# Tempo (segundos) que os dados da planilha ficam em cache antes de uma nova busca
+CACHE_TTL = int(os.environ.get("SERTRANDING_CACHE_TTL", "300"))
+
+# Snapshot local lido na partida do servidor (.parquet ou .feather)
+SNAPSHOT_PATH = os.environ.get(
+    "SERTRANDING_SNAPSHOT", os.path.join(".cache", "sertranding.parquet"))
+
+# "incremental" busca só linhas novas/alteradas; "completo" baixa a aba inteira a cada atualização
+SYNC_MODO = os.environ.get("SERTRANDING_SYNC_MODO", "incremental")
+
+# Mesmo no modo incremental, recarrega a aba inteira a cada N sincronizações
+# para captar edições fora da coluna STATUS e linhas removidas
+SYNC_COMPLETO_A_CADA = int(os.environ.get("SERTRANDING_SYNC_COMPLETO_A_CADA", "12"))
+
+# Fonte dos dados: "google" (planilha online), "csv"/"xlsx" (arquivo local) ou "sqlite"
+FONTE = os.environ.get("SERTRANDING_FONTE", "google")
+FONTE_CAMINHO = os.environ.get("SERTRANDING_FONTE_CAMINHO", "")
+SQLITE_TABELA = os.environ.get("SERTRANDING_SQLITE_TABELA", "sertranding")
+
+# Planilha do Google
+PLANILHA_URL = os.environ.get(
+    "SERTRANDING_PLANILHA_URL",
+    "https://docs.google.com/spreadsheets/d/1l7G_4VAQGyN9cfmpsS-_bnjfzSqXRJViZMCZ8z6vXSc/edit#gid=0")
+PLANILHA_ABA = os.environ.get("SERTRANDING_ABA", "Sertranding")
+# Arquivo de service account; vazio usa a variável de ambiente gcp_service_account
+GOOGLE_CREDENCIAIS = os.environ.get("SERTRANDING_CREDENCIAIS", "")
+
+# Histórico em Parquet (particionado por ano/mês) dos CONCLUÍDOS antigos, ver historico.py
+HISTORICO_PATH = os.environ.get("SERTRANDING_HISTORICO", os.path.join(".cache", "historico"))
+# Idade (meses) a partir da qual um lançamento CONCLUÍDO vai para o histórico
+HISTORICO_MESES = int(os.environ.get("SERTRANDING_HISTORICO_MESES", "12"))
+
+# Métricas por etapa em formato texto do Prometheus (vazio desliga) e de quanto em
+# quanto tempo (segundos) o arquivo é regravado
+METRICAS_PATH = os.environ.get("SERTRANDING_METRICAS", os.path.join(".cache", "metricas.prom"))
+METRICAS_INTERVALO = int(os.environ.get("SERTRANDING_METRICAS_INTERVALO", "15"))
+# Chave do painel de desempenho na barra lateral (abrir com ?admin=<chave>); vazio
+# (o padrão) desliga o painel: defina uma chave própria para usar
+ADMIN_CHAVE = os.environ.get("SERTRANDING_ADMIN_CHAVE", "")
+
+# Limite de requisições à API do Sheets por minuto (a cota do Google é 60 por usuário)
+# e tentativas com backoff exponencial quando ela devolve 429/5xx
+SHEETS_REQ_POR_MINUTO = int(os.environ.get("SERTRANDING_SHEETS_REQ_POR_MINUTO", "50"))
+SHEETS_TENTATIVAS = int(os.environ.get("SERTRANDING_SHEETS_TENTATIVAS", "5"))
+SHEETS_ESPERA_BASE = float(os.environ.get("SERTRANDING_SHEETS_ESPERA_BASE", "1.0"))
+
+# Worker em segundo plano que busca a planilha para todas as sessões
+POLL_ATIVO = os.environ.get("SERTRANDING_POLL_ATIVO", "1") == "1"
+POLL_INTERVALO = int(os.environ.get("SERTRANDING_POLL_INTERVALO", str(CACHE_TTL)))
+# Teto do backoff quando a planilha está falhando
+POLL_INTERVALO_MAXIMO = int(os.environ.get("SERTRANDING_POLL_INTERVALO_MAXIMO", "1800"))
+# De quanto em quanto tempo cada sessão confere se há versão nova
+POLL_VERIFICAR_SESSAO = int(os.environ.get("SERTRANDING_POLL_VERIFICAR_SESSAO", "15"))
+
+# Valores esperados (em maiúsculas) nas colunas STATUS e IMO, separados por "|";
+# outros aparecem em "Qualidade dos dados" na página Lançamentos
+STATUS_VALIDOS = os.environ.get(
+    "SERTRANDING_STATUS_VALIDOS", "AGUARDANDO|CONCLUÍDO|CANCELADO").split("|")
+IMO_VALIDOS = os.environ.get("SERTRANDING_IMO_VALIDOS", "SIM|NÃO").split("|")
+
+# Lançamentos feitos pela página: espera (segundos) para juntar as escritas de
+# várias sessões numa chamada só, e nova tentativa depois de uma falha
+ESCRITA_ESPERA = float(os.environ.get("SERTRANDING_ESCRITA_ESPERA", "2"))
+ESCRITA_ESPERA_FALHA = float(os.environ.get("SERTRANDING_ESCRITA_ESPERA_FALHA", "60"))
+
+# Partida pelo servidor.py: tempo máximo (segundos) que o servidor espera o
+# aquecimento (autenticação, dados e índices) antes de aceitar conexões; o
+# que faltar termina em segundo plano
+AQUECER_ESPERA = float(os.environ.get("SERTRANDING_AQUECER_ESPERA", "60"))
+
+# Colunas lidas da aba (as que a página usa), separadas por "|"; "*" lê todas
+COLUNAS = os.environ.get(
+    "SERTRANDING_COLUNAS",
+    "STATUS|DATA|Nº DI|PROCESSO|PO|TERMINAL|TIPO DE CARGA|Nº CONTAINER|PRODUTO|"
+    "QTD[VOLUME]|MOTORISTA|PESO|IMO|DAST|NOTA FISCAL|VALOR NF")
+COLUNAS = None if COLUNAS.strip() == "*" else COLUNAS.split("|")
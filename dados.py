@@ -0,0 +1,353 @@
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import config
+import formatacao
+import fontes
+import qualidade
+import sincronizacao
+from instrumentacao import etapa, registro
+
+logger = logging.getLogger(__name__)
+
+# O df é montado uma vez por processo e compartilhado só para leitura entre as
+# sessões; com Copy-on-Write (padrão no pandas 3) quem precisar alterar algo
+# ganha a própria cópia só da coluna que mudou
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Texto de baixa cardinalidade guardado como categoria
+CATEGORICAS = ['STATUS', 'IMO', 'TIPO DE CARGA', 'TERMINAL', 'MOTORISTA']
+
+# Texto em Arrow com NaN como ausente: o mesmo tipo que o pandas 3 infere numa
+# leitura completa (o 'string[pyarrow]' usa pd.NA e o df.equals nunca bateria)
+if int(pd.__version__.split('.')[0]) < 3:
+    TEXTO = 'string[pyarrow]'
+else:
+    TEXTO = pd.StringDtype('pyarrow', na_value=np.nan)
+
+
+def _preenchidas(bruto):
+    preenchida = np.zeros(len(bruto), dtype=bool)
+    for col in range(bruto.shape[1]):
+        preenchida |= (bruto.iloc[:, col].astype(str).str.strip() != '').to_numpy()
+    return preenchida
+
+
+def montar_bruto(grade):
+    """GradeColunar -> DataFrame de texto só com as linhas não vazias (índice = linha da aba)."""
+    tamanho = max((len(v) for v in grade.valores), default=0)
+    inicio = grade.linha_cabecalho + 1
+    bruto = pd.DataFrame(
+        {i: v + [''] * (tamanho - len(v)) for i, v in enumerate(grade.valores)},
+        index=pd.RangeIndex(inicio, inicio + tamanho, name='LINHA'))
+    bruto.columns = grade.nomes
+    return bruto[_preenchidas(bruto)]
+
+
+def tipar(bruto):
+    df = bruto.copy()
+
+    colunas_numericas = ['VALOR NF', 'PESO']
+    for col in colunas_numericas:
+        if col in df.columns:
+            df[col] = formatacao.parse_numero(df[col])
+
+    if 'DATA' in df.columns:
+        df['DATA'] = pd.to_datetime(df['DATA'], dayfirst=True, errors='coerce')
+
+    return compactar(df)
+
+
+def compactar(df):
+    """Categorias para o texto repetitivo, float32 quando não perde nada e texto em Arrow."""
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in CATEGORICAS:
+            if not isinstance(serie.dtype, pd.CategoricalDtype):
+                colunas[col] = serie.astype('category')
+        elif serie.dtype == np.float64:
+            menor = serie.astype(np.float32)
+            preenchida = serie.notna()
+            if (menor[preenchida].astype(np.float64) == serie[preenchida]).all():
+                colunas[col] = menor
+        elif serie.dtype == object or (isinstance(serie.dtype, pd.StringDtype)
+                                       and serie.dtype != TEXTO):
+            # Objeto Python (pandas 2, linhas de um sync) ou texto de snapshot antigo
+            colunas[col] = serie.astype(TEXTO)
+    return df.assign(**colunas) if colunas else df
+
+
+def montar_dataframe(data):
+    return tipar(montar_bruto(fontes.colunar(data)))
+
+
+def ler_planilha():
+    with etapa('planilha_leitura') as medicao:
+        grade = fontes.fonte_configurada().ler_colunas(config.COLUNAS)
+        medicao.linhas = max((len(v) for v in grade.valores), default=0)
+    with etapa('montar_bruto') as medicao:
+        bruto = medicao.df(montar_bruto(grade))
+    with etapa('tipar') as medicao:
+        df = medicao.df(tipar(bruto))
+    estado = sincronizacao.EstadoSync(grade, bruto)
+    with etapa('qualidade') as medicao:
+        estado.problemas = qualidade.problemas_celulas(bruto, df)
+        medicao.linhas = len(estado.problemas)
+    return df, estado
+
+
+def sincronizar(df, estado):
+    """Aplica ao df as linhas novas/alteradas na planilha. None se for preciso recarregar tudo."""
+    with etapa('planilha_alteracoes') as medicao:
+        bruto = medicao.df(sincronizacao.buscar_alteracoes(fontes.fonte_configurada(), estado))
+    if bruto is None:
+        return None
+    if bruto.empty:
+        return df
+
+    estado.alteradas = bruto.index.to_numpy()
+    novas = tipar(bruto[_preenchidas(bruto)])
+    estado.problemas = qualidade.atualizar_celulas(estado.problemas, bruto, novas)
+    return _aplicar(df, bruto.index, novas)
+
+
+def _aplicar(df, linhas, novas):
+    # Copia só na troca: quem já leu o df antigo continua com uma versão consistente
+    df = df.drop(index=linhas.intersection(df.index))
+    # Categorias diferentes viram objeto no concat: compacta de novo
+    return compactar(pd.concat([df, novas]).sort_index())
+
+
+def com_linhas_tipadas(df, novas):
+    return _aplicar(df, novas.index, novas)
+
+
+def com_linhas(df, bruto):
+    """df com as linhas de texto (índice = linha da aba) aplicadas, como num sync."""
+    return _aplicar(df, bruto.index, tipar(bruto[_preenchidas(bruto)]))
+
+
+def com_valores(df, coluna, valores):
+    """df com a coluna trocada nas linhas de valores (Series indexada pela linha da aba)."""
+    serie = df[coluna]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        novas = pd.Index(valores.unique()).difference(serie.cat.categories)
+        serie = serie.cat.add_categories(novas)
+    else:
+        serie = serie.copy()
+    serie.loc[valores.index] = valores.to_numpy()
+    return df.assign(**{coluna: serie})
+
+
+# Snapshot local (Parquet/Feather)
+
+def ler_snapshot(caminho=config.SNAPSHOT_PATH):
+    if not os.path.exists(caminho):
+        return None, None
+    try:
+        if caminho.endswith('.feather'):
+            df = pd.read_feather(caminho)
+            if 'LINHA' in df.columns:
+                df = df.set_index('LINHA')
+        else:
+            df = pd.read_parquet(caminho)
+    except Exception:
+        logger.exception("Snapshot %s ilegível, ignorando", caminho)
+        return None, None
+    # Snapshots antigos foram gravados antes da compactação
+    return compactar(df), os.path.getmtime(caminho)
+
+
+def salvar_snapshot(df, caminho=config.SNAPSHOT_PATH):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    # Grava em arquivo temporário e troca de uma vez para nunca deixar um snapshot pela metade
+    temporario = f"{caminho}.tmp"
+    if caminho.endswith('.feather'):
+        df.reset_index().to_feather(temporario)
+    else:
+        df.to_parquet(temporario)
+    os.replace(temporario, caminho)
+
+
+# Cache compartilhado entre todas as sessões do processo
+
+class CacheDados:
+    def __init__(self):
+        self.df = None
+        self.carregado_em = 0.0
+        self.versao = 0
+        self.lock = threading.Lock()
+        self.lock_busca = threading.Lock()
+        self.atualizando = False
+        self.sync = None
+        self.derivados = {}
+        # Depois de um sync incremental: estruturas da versão anterior que sabem
+        # se atualizar (método atualizar) e as linhas que mudaram
+        self.anteriores = {}
+        self.alteradas = None
+        # Células ilegíveis do df atual (qualidade.problemas_celulas); None se desconhecidas
+        self.problemas = None
+        # Última falha ao buscar a planilha (None quando a última busca deu certo)
+        self.falha = None
+        self.falha_em = None
+
+    def expirado(self):
+        return time.time() - self.carregado_em > config.CACHE_TTL
+
+    def publicar(self, df, carregado_em=None, alteradas=None, problemas=None):
+        with self.lock:
+            # Mesmos dados: só renova o horário, sem criar versão nova
+            if df is not self.df:
+                self.anteriores = {} if alteradas is None else {
+                    nome: valor for nome, (_, valor, _) in self.derivados.items()
+                    if hasattr(valor, 'atualizar')}
+                self.alteradas = alteradas
+                self.problemas = problemas
+                self.df = df
+                self.derivados = {}
+                self.versao += 1
+            self.carregado_em = carregado_em or time.time()
+
+
+@st.cache_resource
+def cache_dados():
+    return CacheDados()
+
+
+def derivado(df, nome, construir, chave=None):
+    """Estrutura derivada do df (índices, agregados...), montada uma vez por versão dos dados.
+
+    chave distingue variantes da mesma estrutura (dia, arquivo de histórico...):
+    uma chave nova remonta no lugar da anterior, com o mesmo nome nas métricas.
+    """
+    cache = cache_dados()
+    guardado = cache.derivados.get(nome)
+    if guardado is not None and guardado[0] is df and guardado[2] == chave:
+        registro().cache_usado(nome, True)
+        return guardado[1]
+    registro().cache_usado(nome, False)
+    with etapa(f'derivado_{nome}'):
+        valor = construir(df)
+    with cache.lock:
+        if cache.df is df:
+            cache.derivados[nome] = (df, valor, chave)
+    return valor
+
+
+def derivado_anterior(nome):
+    """(estrutura da versão anterior, linhas alteradas) após um sync; (None, None) se não houver."""
+    cache = cache_dados()
+    with cache.lock:
+        valor = cache.anteriores.get(nome)
+        return (valor, cache.alteradas) if valor is not None else (None, None)
+
+
+def _gravar_snapshot(df, problemas=None):
+    try:
+        if problemas is not None:
+            qualidade.salvar_problemas(problemas)
+        salvar_snapshot(df)
+    except Exception:
+        logger.exception("Falha ao gravar o snapshot local")
+
+
+def atualizar_dados(completo=False):
+    """Busca a planilha agora e publica o resultado para todas as sessões."""
+    cache = cache_dados()
+    with cache.lock_busca:
+        anterior = cache.df
+        df = None
+        alteradas = None
+        try:
+            if (not completo and config.SYNC_MODO == 'incremental'
+                    and fontes.fonte_configurada().incremental and cache.sync is not None
+                    and anterior is not None):
+                df = sincronizar(anterior, cache.sync)
+                alteradas = cache.sync.alteradas if df is not None else None
+            if df is None:
+                df, cache.sync = ler_planilha()
+                if anterior is not None and df.equals(anterior):
+                    df = anterior
+        except Exception as erro:
+            # Quem já tem dados continua com eles; a página avisa que estão desatualizados
+            cache.falha, cache.falha_em = erro, time.time()
+            raise
+        cache.falha = cache.falha_em = None
+        cache.publicar(df, alteradas=alteradas, problemas=cache.sync.problemas)
+    if df is not anterior:
+        _gravar_snapshot(df, cache.problemas)
+    return df
+
+
+def publicar_local(alterar, alteradas):
+    """Publica já uma alteração feita pela página, antes de a planilha confirmar.
+
+    alterar(df) devolve o df novo. O snapshot não é regravado: o próximo sync
+    traz as mesmas linhas da planilha e grava.
+    """
+    cache = cache_dados()
+    with cache.lock_busca:
+        if cache.df is None:
+            return None
+        cache.publicar(alterar(cache.df), cache.carregado_em,
+                       alteradas=np.asarray(alteradas), problemas=cache.problemas)
+        return cache.df
+
+
+def _atualizar_em_segundo_plano(cache):
+    with cache.lock:
+        if cache.atualizando:
+            return
+        cache.atualizando = True
+
+    def tarefa():
+        try:
+            atualizar_dados()
+        except Exception:
+            logger.exception("Falha ao atualizar os dados da planilha")
+        finally:
+            cache.atualizando = False
+
+    threading.Thread(target=tarefa, name="sertranding-refresh",
+                     daemon=True).start()
+
+
+def carregar_dados():
+    cache = cache_dados()
+    registro().cache_usado('dados', cache.df is not None)
+
+    # Partida a frio: usa o snapshot local sem esperar pela planilha
+    if cache.df is None:
+        with cache.lock_busca:
+            if cache.df is None:
+                with etapa('snapshot_ler') as medicao:
+                    df, modificado_em = ler_snapshot()
+                    medicao.df(df)
+                if df is not None:
+                    cache.publicar(df, modificado_em, problemas=qualidade.ler_problemas())
+                else:
+                    try:
+                        df, cache.sync = ler_planilha()
+                    except Exception as erro:
+                        cache.falha, cache.falha_em = erro, time.time()
+                        raise
+                    cache.falha = cache.falha_em = None
+                    cache.publicar(df, problemas=cache.sync.problemas)
+                    _gravar_snapshot(df, cache.problemas)
+
+    # Dados vencidos continuam sendo servidos enquanto a nova busca roda
+    # (com o worker de atualizador.py ligado, é ele quem busca)
+    if cache.expirado() and not config.POLL_ATIVO:
+        _atualizar_em_segundo_plano(cache)
+
+    return cache.df
@@ -0,0 +1,363 @@
+import datetime
+import logging
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import busca
+import config
+import dados
+import fontes
+import formatacao
+from instrumentacao import etapa
+
+logger = logging.getLogger(__name__)
+
+# Lançamentos feitos pela página Lançamentos: novas linhas e trocas de STATUS.
+# Nada vai direto para a planilha. Cada alteração entra numa fila única do
+# processo e o df compartilhado é atualizado na hora (todas as sessões já
+# veem a mudança). Depois de config.ESCRITA_ESPERA segundos a fila é enviada
+# de uma vez: os STATUS (a última edição de cada linha vence) numa única
+# values.batchUpdate e as linhas novas num único append. Se a API falhar, as
+# alterações voltam para a fila e são reenviadas mais tarde.
+#
+# O rótulo do df é o número da linha na aba, que muda quando alguém insere,
+# apaga ou ordena linhas. Antes de gravar o STATUS o PROCESSO de cada linha é
+# conferido; se não bater (ou se o append cair no meio dos dados e empurrar
+# as linhas de baixo), a aba é relida inteira e as trocas pendentes são
+# refeitas na linha nova do mesmo PROCESSO.
+
+
+class FilaEscrita:
+    def __init__(self, espera, espera_falha):
+        self.espera = espera
+        self.espera_falha = espera_falha
+        self.lock = threading.Lock()
+        # Linha da aba -> (STATUS novo, PROCESSO esperado na linha)
+        self.status = {}
+        # Linhas novas: (rótulo provisório no df, {coluna: texto})
+        self.novas = []
+        self.falha = None
+        self.falha_em = None
+        self.enviadas = 0
+        # Trocas de STATUS cujo PROCESSO não foi mais achado na aba
+        self.descartadas = 0
+        self._timer = None
+
+    def pendentes(self):
+        with self.lock:
+            return len(self.status) + len(self.novas)
+
+    def _agendar(self, espera):
+        # Chamado com self.lock: um envio agendado por vez
+        if self._timer is None:
+            self._timer = threading.Timer(espera, self.enviar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def trocar_status(self, valores):
+        """valores: Series STATUS novo indexada pela linha da aba."""
+        if valores.empty:
+            return
+        df = dados.publicar_local(lambda df: dados.com_valores(df, 'STATUS', valores),
+                                  valores.index)
+        processos = _processos(df, valores.index)
+        with self.lock:
+            # Linha nova ainda não enviada: o STATUS vai junto no append
+            novas = {rotulo: linha for rotulo, linha in self.novas}
+            for rotulo, valor in zip(valores.index.tolist(), valores.tolist()):
+                if rotulo in novas:
+                    novas[rotulo]['STATUS'] = valor
+                else:
+                    self.status[rotulo] = (valor, processos[rotulo])
+            self._agendar(self.espera)
+
+    def incluir(self, linhas):
+        """linhas: lista de {coluna: texto}, como seriam digitadas na planilha."""
+        if not linhas:
+            return
+        df = dados.cache_dados().df
+        # Aba só com o cabeçalho: as linhas novas vêm logo abaixo dele
+        conhecida = (int(df.index.max()) if len(df)
+                     else fontes.fonte_configurada().cabecalho()[0])
+        with self.lock:
+            # Rótulos provisórios depois da última linha conhecida (df ou fila)
+            ultima = max([conhecida] + [rotulo for rotulo, _ in self.novas])
+            rotulos = list(range(ultima + 1, ultima + 1 + len(linhas)))
+            self.novas += list(zip(rotulos, linhas))
+            self._agendar(self.espera)
+        bruto = pd.DataFrame(linhas, index=pd.Index(rotulos, name='LINHA'), dtype=object)
+        dados.publicar_local(
+            lambda df: dados.com_linhas(df, bruto.reindex(columns=df.columns, fill_value='')),
+            rotulos)
+
+    def enviar(self):
+        with self.lock:
+            self._timer = None
+            status, self.status = self.status, {}
+            novas, self.novas = self.novas, []
+        if not status and not novas:
+            return
+        incluidas, primeira, deslocadas = [], None, {}
+        try:
+            with etapa('escrita_enviar') as medicao:
+                medicao.linhas = len(status) + len(novas)
+                cab, letras = fontes.fonte_configurada().cabecalho()
+                if status:
+                    deslocadas = _enviar_status(status, letras)
+                    status = {}
+                if novas:
+                    # O append procura o fim da tabela a partir da última linha conhecida
+                    primeira = _enviar_novas(novas, max(novas[0][0] - 1, cab), letras)
+                    # Já estão na aba: não voltam para a fila nem se o resto falhar
+                    incluidas, novas = novas, []
+        except Exception as erro:
+            logger.exception("Falha ao gravar %d alteração(ões) na planilha",
+                             len(status) + len(novas))
+            with self.lock:
+                # Edições feitas enquanto isso são mais novas: prevalecem (as
+                # deslocadas voltam também e são conferidas de novo no reenvio)
+                self.status = {**status, **deslocadas, **self.status}
+                self.novas = novas + self.novas
+                self.falha, self.falha_em = erro, time.time()
+                self._agendar(self.espera_falha)
+            deslocadas = {}
+        else:
+            with self.lock:
+                self.falha = self.falha_em = None
+                self.enviadas += medicao.linhas - len(deslocadas)
+
+        recarregar = bool(deslocadas)
+        if incluidas:
+            provisorios = [rotulo for rotulo, _ in incluidas]
+            reais = list(range(primeira, primeira + len(incluidas)))
+            if primeira < provisorios[0]:
+                # Caiu no meio dos dados: todas as linhas abaixo desceram
+                recarregar = True
+            elif reais != provisorios:
+                # Outra pessoa incluiu linhas na aba nesse meio tempo
+                dados.publicar_local(lambda df: _trocar_rotulos(df, provisorios, reais),
+                                     provisorios + reais)
+        if recarregar:
+            self._recarregar(deslocadas)
+
+    def _recarregar(self, deslocadas):
+        """Relê a aba inteira e refaz as trocas de STATUS que não acharam o PROCESSO."""
+        try:
+            df = dados.atualizar_dados(completo=True)
+        except Exception as erro:
+            logger.exception("Falha ao reler a planilha depois de uma gravação")
+            with self.lock:
+                # Na próxima tentativa o PROCESSO é conferido de novo
+                self.status = {**deslocadas, **self.status}
+                self.falha, self.falha_em = erro, time.time()
+                self._agendar(self.espera_falha)
+            return
+        if not deslocadas or 'PROCESSO' not in df.columns:
+            return
+        texto = _texto(df['PROCESSO'])
+        procurados = texto[texto.isin([processo for _, processo in deslocadas.values()]).to_numpy()]
+        refeitas = {}
+        for linha, (valor, processo) in deslocadas.items():
+            achadas = procurados.index[(procurados == processo).to_numpy()]
+            if len(achadas) == 1:
+                refeitas[achadas[0]] = valor
+            else:
+                logger.warning("STATUS %s da linha %d descartado: PROCESSO %r achado %d vez(es)",
+                               valor, linha, processo, len(achadas))
+                with self.lock:
+                    self.descartadas += 1
+        if refeitas:
+            self.trocar_status(pd.Series(refeitas))
+
+
+def _texto(serie):
+    return serie.astype('string').fillna('').str.strip()
+
+
+def _processos(df, linhas):
+    """{linha: PROCESSO como texto} ('' sem a coluna ou em branco)."""
+    if df is None or 'PROCESSO' not in df.columns:
+        return dict.fromkeys(linhas.tolist(), '')
+    return dict(zip(linhas.tolist(), _texto(df['PROCESSO'].reindex(linhas)).tolist()))
+
+
+def _enviar_status(status, letras):
+    """Grava os STATUS das linhas que ainda têm o PROCESSO esperado; devolve as outras."""
+    deslocadas = {}
+    if 'PROCESSO' in letras:
+        # PROCESSO de todas as linhas numa leitura só, logo antes de gravar
+        letra = letras['PROCESSO']
+        faixas = fontes.faixas_contiguas(list(status))
+        blocos = fontes.fonte_configurada().ler_faixas(
+            [f"{letra}{inicio}:{letra}{fim}" for inicio, fim in faixas], colunas=True)
+        for (inicio, fim), bloco in zip(faixas, blocos):
+            atuais = [str(v).strip() for v in bloco[0]] if bloco else []
+            for n in range(inicio, fim + 1):
+                atual = atuais[n - inicio] if n - inicio < len(atuais) else ''
+                if atual != status[n][1]:
+                    deslocadas[n] = status[n]
+
+    letra = letras['STATUS']
+    faixas, valores = [], []
+    for inicio, fim in fontes.faixas_contiguas([n for n in status if n not in deslocadas]):
+        faixas.append(f"{letra}{inicio}:{letra}{fim}")
+        valores.append([[status[n][0]] for n in range(inicio, fim + 1)])
+    if faixas:
+        fontes.cliente_planilha().update_values_batch(faixas, valores)
+    return deslocadas
+
+
+def _enviar_novas(novas, inicio, letras):
+    """Append das linhas novas; devolve o número da primeira linha gravada na aba."""
+    # Cada valor na coluna da aba com o mesmo nome
+    indices = {nome: fontes.numero_coluna(letra) - 1 for nome, letra in letras.items()}
+    largura = max(indices.values()) + 1
+    linhas = []
+    for _, valores in novas:
+        linha = [''] * largura
+        for nome, texto in valores.items():
+            if nome in indices:
+                linha[indices[nome]] = texto
+        linhas.append(linha)
+    resposta = fontes.cliente_planilha().append_table(linhas, f"A{inicio}")
+    return resposta['updates']['updatedRange'].start.row
+
+
+def _trocar_rotulos(df, provisorios, reais):
+    linhas = df.loc[df.index.intersection(provisorios)]
+    linhas = linhas.set_axis(linhas.index.map(dict(zip(provisorios, reais))))
+    # Se um sync já trouxe as linhas reais, as provisórias (iguais) tomam o lugar delas
+    return dados.com_linhas_tipadas(df.drop(index=df.index.intersection(provisorios)), linhas)
+
+
+@st.cache_resource
+def fila_escrita():
+    return FilaEscrita(config.ESCRITA_ESPERA, config.ESCRITA_ESPERA_FALHA)
+
+
+# Telas da página Lançamentos
+
+# Colunas de lista: escolhe entre os valores que já existem (ou digita um novo)
+ESCOLHAS = ['STATUS', 'TERMINAL', 'TIPO DE CARGA', 'IMO']
+ESPERADOS = {'STATUS': config.STATUS_VALIDOS, 'IMO': config.IMO_VALIDOS}
+OBRIGATORIOS = ['PROCESSO', 'DATA', 'STATUS']
+
+# Linhas exibidas de uma vez na grade de STATUS
+LINHAS_EDICAO = 500
+
+
+def _opcoes(df, coluna, esperados=()):
+    existentes = df[coluna].dropna().astype(str).str.strip() if coluna in df.columns else []
+    return list(esperados) + sorted(set(existentes) - set(esperados) - {''})
+
+
+def _texto_planilha(valores):
+    """Valores do formulário -> texto como digitado na planilha (mesmo parse da leitura)."""
+    linha = {}
+    for nome, valor in valores.items():
+        if valor is None or valor == '':
+            continue
+        if nome == 'DATA':
+            linha[nome] = valor.strftime('%d/%m/%Y')
+        elif nome == 'VALOR NF':
+            linha[nome] = formatacao.formatar_moeda(pd.Series([valor])).iloc[0]
+        elif nome == 'PESO':
+            linha[nome] = formatacao.formatar_peso(pd.Series([valor])).iloc[0]
+        elif nome == 'QTD[VOLUME]':
+            linha[nome] = str(int(valor))
+        else:
+            linha[nome] = str(valor).strip()
+    return linha
+
+
+def situacao_fila():
+    fila = fila_escrita()
+    pendentes = fila.pendentes()
+    if fila.falha is not None:
+        falha_em = datetime.datetime.fromtimestamp(fila.falha_em)
+        st.warning(f"⚠️ A planilha não aceitou a última gravação "
+                   f"({falha_em.strftime('%H:%M:%S')}). {pendentes} alteração(ões) serão reenviadas automaticamente.")
+    elif pendentes:
+        st.caption(f"⏳ {pendentes} alteração(ões) aguardando envio para a planilha.")
+    if fila.descartadas:
+        st.warning(f"⚠️ {fila.descartadas} troca(s) de STATUS não foram gravadas: o PROCESSO "
+                   "mudou de linha na planilha e não foi encontrado. Confira na planilha.")
+
+
+def formulario_lancamento(df):
+    colunas = [c for c in config.COLUNAS or df.columns if c in df.columns]
+    with st.form("novo_lancamento", clear_on_submit=True):
+        valores = {}
+        campos = st.columns(4)
+        for i, nome in enumerate(colunas):
+            campo = campos[i % 4]
+            rotulo = f"{nome} *" if nome in OBRIGATORIOS else nome
+            if nome == 'DATA':
+                valores[nome] = campo.date_input(rotulo, value=None, format="DD/MM/YYYY")
+            elif nome in ('VALOR NF', 'PESO'):
+                valores[nome] = campo.number_input(rotulo, min_value=0.0, value=None,
+                                                   format="%.2f" if nome == 'VALOR NF' else "%.0f")
+            elif nome == 'QTD[VOLUME]':
+                valores[nome] = campo.number_input(rotulo, min_value=0, value=None, step=1)
+            elif nome in ESCOLHAS:
+                valores[nome] = campo.selectbox(rotulo,
+                                                options=_opcoes(df, nome, ESPERADOS.get(nome, ())),
+                                                index=None, accept_new_options=True)
+            else:
+                valores[nome] = campo.text_input(rotulo)
+        enviado = st.form_submit_button("➕ Incluir lançamento")
+
+    if enviado:
+        faltando = [n for n in OBRIGATORIOS if n in valores and not valores[n]]
+        if faltando:
+            st.error(f"Preencha {', '.join(faltando)}.")
+            return
+        fila_escrita().incluir([_texto_planilha(valores)])
+        st.success(f"✅ Lançamento {valores.get('PROCESSO', '')} incluído.")
+
+
+def edicao_status(df):
+    opcoes = _opcoes(df, 'STATUS', config.STATUS_VALIDOS)
+    col1, col2 = st.columns(2)
+    filtro = col1.multiselect("📌 Status", options=opcoes, key="edicao_filtro",
+                              default=['AGUARDANDO'] if 'AGUARDANDO' in opcoes else [])
+    consulta = col2.text_input("🔎 Buscar", key="edicao_busca",
+                               placeholder="Processo, container, DI, nota fiscal, PO ou motorista")
+
+    selecao = np.ones(len(df), dtype=bool)
+    if filtro:
+        selecao &= df['STATUS'].astype(str).isin(filtro).to_numpy()
+    achadas = busca.indice_busca(df).buscar(consulta)
+    if achadas is not None:
+        na_busca = np.zeros(len(df), dtype=bool)
+        na_busca[achadas] = True
+        selecao &= na_busca
+    posicoes = np.flatnonzero(selecao)
+
+    contexto = [c for c in ['PROCESSO', 'DATA', 'Nº CONTAINER', 'TERMINAL'] if c in df.columns]
+    tabela = df.iloc[posicoes[:LINHAS_EDICAO]][contexto + ['STATUS']]
+    tabela = tabela.assign(STATUS=tabela['STATUS'].astype(object))
+    st.caption(f"{len(posicoes)} lançamento(s); mostrando {len(tabela)}. "
+               "LINHA é o número da linha na aba.")
+    editada = st.data_editor(
+        tabela,
+        key="edicao_status",
+        disabled=contexto,
+        width="stretch",
+        column_config={
+            "STATUS": st.column_config.SelectboxColumn("STATUS", options=opcoes, required=True),
+            "DATA": st.column_config.DateColumn("DATA", format="DD/MM/YYYY"),
+        }
+    )
+
+    mudou = (editada['STATUS'] != tabela['STATUS']).to_numpy()
+    if st.button(f"💾 Salvar {mudou.sum()} alteração(ões)", disabled=not mudou.any(),
+                 key="edicao_salvar"):
+        fila_escrita().trocar_status(editada['STATUS'][mudou])
+        # A grade volta a partir do df já alterado
+        del st.session_state["edicao_status"]
+        st.rerun()
@@ -1,53 +1,24 @@
 import streamlit as st
 import pandas as pd
-import pygsheets
 import datetime
+import time
 
+import numpy as np
 
-def format_number(value, prefix='R$'):
-    if pd.isna(value):
-        return f"{prefix} 0,00"
-    for unit in ['', ' mil']:
-        if value < 1000:
-            return f"{prefix} {value:,.2f}{unit}".replace(",", "X").replace(".", ",").replace("X", ".")
-        value /= 1000
-    return f"{prefix} {value:,.2f} milhões".replace(",", "X").replace(".", ",").replace("X", ".")
-
-
-@st.cache_resource
-def conectar_planilha():
-    gc = pygsheets.authorize(service_account_env_var='gcp_service_account')
-
-    url = "https://docs.google.com/spreadsheets/d/1l7G_4VAQGyN9cfmpsS-_bnjfzSqXRJViZMCZ8z6vXSc/edit#gid=0"
-    arquivo = gc.open_by_url(url)
-    aba = arquivo.worksheet_by_title("Sertranding")
-    return aba
-
-
-def carregar_dados():
-    aba = conectar_planilha()
-    data = aba.get_all_values()
-
-    data = list(
-        map(list, zip(*[col for col in zip(*data) if any(cell.strip() for cell in col)])))
-    data = [row for row in data if any(cell.strip() for cell in row)]
-    header = [
-        col if col.strip() != '' else f'Coluna_{i}' for i, col in enumerate(data[0])]
-    df = pd.DataFrame(data[1:], columns=header)
-
-    colunas_numericas = ['VALOR NF', 'PESO']
-    for col in colunas_numericas:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.replace(r'[^\d,.-]', '', regex=True)\
-                .str.replace('.', '', regex=False)\
-                .str.replace(',', '.', regex=False)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    if 'DATA' in df.columns:
-        df['DATA'] = pd.to_datetime(df['DATA'], dayfirst=True, errors='coerce')
-
-    return df
+import atualizador
+import busca
+import dados
+import exportar
+import historico
+import instrumentacao
+from instrumentacao import etapa
+from indice import IndiceDatas, IndiceFiltros, rotulo_mes
+from metricas import CuboMetricas, kpis_linhas
+from pendentes import painel_pendentes
+from formatacao import format_number
+from tabela import tabela_paginada
 
+inicio_pagina = time.perf_counter()
 
 st.markdown("""
 <div style='display: flex; align-items: center; gap: 10px; font-size: 30px; font-weight: bold;'>
@@ -57,115 +28,144 @@ st.markdown("""
 <hr style='border-top: 1px solid blue; margin-top: 4px;' />
 """, unsafe_allow_html=True)
 
-df = carregar_dados()
-
-# Filtros
-col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
-
-filtro_mes = col1.multiselect(
-    "📅 Mês", options=df['DATA'].dt.month_name().dropna().unique())
-filtro_status = col2.multiselect(
-    "📌 Status", options=df['STATUS'].dropna().unique())
-filtro_imo = col3.multiselect("☣️ IMO", options=df['IMO'].dropna().unique())
-filtro_carga = col4.multiselect(
-    "🚛 Tipo de Carga", options=df['TIPO DE CARGA'].dropna().unique())
-
-# Aplicar filtros
-df_filtrado = df.copy()
-if filtro_mes:
-    df_filtrado = df_filtrado[df_filtrado['DATA'].dt.month_name().isin(
-        filtro_mes)]
-if filtro_status:
-    df_filtrado = df_filtrado[df_filtrado['STATUS'].isin(filtro_status)]
-if filtro_imo:
-    df_filtrado = df_filtrado[df_filtrado['IMO'].isin(filtro_imo)]
-if filtro_carga:
-    df_filtrado = df_filtrado[df_filtrado['TIPO DE CARGA'].isin(filtro_carga)]
-
-# Métricas
-m1, m2, m3, m4, m5 = st.columns(5)
-m1.metric("💰 Total Transportado", format_number(df_filtrado['VALOR NF'].sum()))
-m2.metric("📄 NFs Emitidas", f"{df_filtrado.shape[0]}")
-m3.metric("⚖️ Peso Total", format_number(df_filtrado['PESO'].sum(), "kg"))
-
-aguardando = df_filtrado[df_filtrado['STATUS'].str.upper()
-                         == 'AGUARDANDO'].shape[0]
-concluido = df_filtrado[df_filtrado['STATUS'].str.upper()
-                        == 'CONCLUÍDO'].shape[0]
-m4.metric("🟡 Aguardando", aguardando)
-m5.metric("✅ Concluídos", concluido)
-
-# Emojis e formatações
-
-
-def status_com_emoji(s):
-    s = str(s).upper()
-    if s == "CONCLUÍDO":
-        return "✅ CONCLUÍDO"
-    if s == "AGUARDANDO":
-        return "🟡 AGUARDANDO"
-    if s == "CANCELADO":
-        return "❌ CANCELADO"
-    return s
-
-
-def status_imo(s):
-    if s == "SIM":
-        return "☣️ SIM"
-    if s == "NÃO":
-        return "🟢 NÃO"
-    return s
-
-
-df_filtrado["STATUS_EMOJI"] = df_filtrado["STATUS"].apply(status_com_emoji)
-df_filtrado["IMO_EMOJI"] = df_filtrado["IMO"].apply(status_imo)
-
-# Painel de alertas
-hoje = pd.Timestamp(datetime.datetime.now().date())
-if 'DATA' in df_filtrado.columns and 'STATUS' in df_filtrado.columns:
-    pendentes = df_filtrado[df_filtrado['STATUS'].str.upper()
-                            == 'AGUARDANDO'].copy()
-    pendentes['DIAS_RESTANTES'] = (pendentes['DATA'] - hoje).dt.days
-
-    with st.expander("📌 Processos Pendentes", expanded=False):
-        if pendentes.empty:
-            st.success("✅ Nenhum processo com status 'AGUARDANDO'.")
-        else:
-            pendentes = pendentes.sort_values('DIAS_RESTANTES')
-            for _, row in pendentes.iterrows():
-                dias = row['DIAS_RESTANTES']
-                data_str = row['DATA'].strftime(
-                    '%d/%m/%Y') if pd.notna(row['DATA']) else "sem data"
-                processo = row.get('PROCESSO', '---')
-                if dias < 0:
-                    st.error(
-                        f"❌ Processo `{processo}` — vencido há {-dias} dias ({data_str})")
-                elif dias == 0:
-                    st.info(
-                        f"⚠️ Processo `{processo}` — vence hoje ({data_str})")
-                else:
-                    st.warning(
-                        f"📅 Processo `{processo}` — faltam {dias} dias ({data_str})")
-
-# Formatar valores
-df_filtrado["PESO"] = df_filtrado["PESO"].apply(
-    lambda x: f"{x:,.0f} kg".replace(",", "X").replace(".", ",").replace("X", "."))
-df_filtrado["VALOR NF"] = df_filtrado["VALOR NF"].apply(
-    lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
-
-# Exibir a tabela
-st.dataframe(
-    df_filtrado.reset_index(drop=True)[
-        ['STATUS_EMOJI', 'DATA', 'Nº DI', 'PROCESSO', 'PO', 'TERMINAL',
-         'TIPO DE CARGA', 'Nº CONTAINER', 'PRODUTO', 'QTD[VOLUME]', 'MOTORISTA',
-         'PESO', 'IMO_EMOJI', 'DAST', 'NOTA FISCAL', 'VALOR NF']
-    ],
-    use_container_width=True,
-    column_config={
-        "STATUS_EMOJI": st.column_config.TextColumn("STATUS"),
-        "IMO_EMOJI": st.column_config.TextColumn("IMO"),
-        "DATA": st.column_config.DateColumn("DATA", format="DD/MM/YYYY"),
-        "VALOR NF": st.column_config.TextColumn("VALOR NF"),
-        "PESO": st.column_config.TextColumn("PESO"),
+try:
+    with etapa('carregar') as medicao:
+        df = medicao.df(dados.carregar_dados())
+except Exception:
+    # Sem snapshot e sem planilha não há o que mostrar
+    st.error("❌ Não foi possível acessar a planilha e não há uma cópia local dos dados. "
+             "Tente novamente em alguns minutos.")
+    st.stop()
+atualizador.iniciar_atualizador()
+
+# Atualização manual
+col_atualizado, col_botao = st.columns([4, 1])
+if col_botao.button("🔄 Atualizar agora", width="stretch"):
+    try:
+        df = dados.atualizar_dados()
+    except Exception:
+        df = dados.carregar_dados()
+cache = dados.cache_dados()
+carregado_em = datetime.datetime.fromtimestamp(cache.carregado_em)
+col_atualizado.caption(
+    f"Dados atualizados em {carregado_em.strftime('%d/%m/%Y %H:%M:%S')} (versão {cache.versao})")
+if cache.falha is not None:
+    falha_em = datetime.datetime.fromtimestamp(cache.falha_em)
+    st.warning(f"⚠️ A planilha não respondeu na última busca ({falha_em.strftime('%H:%M:%S')}). "
+               f"Exibindo os dados de {carregado_em.strftime('%d/%m/%Y %H:%M')}.")
+atualizador.aviso_nova_versao(cache.versao)
+
+# Fragmento: mudar um filtro reexecuta só este bloco; pendentes e tabela são
+# fragmentos internos. O df da execução completa é compartilhado só para leitura.
+
+
+@st.fragment
+def painel(df):
+    with etapa('painel'):
+        _painel(df)
+
+
+def _painel(df):
+    # Filtros (opções e seleção servidas pelo índice montado na carga)
+    indice = dados.derivado(df, 'filtros', IndiceFiltros)
+    datas = dados.derivado(df, 'datas', IndiceDatas)
+    meses_arquivados = historico.meses_arquivados()
+    com_historico = bool(meses_arquivados) and st.toggle(
+        "🗄️ Incluir histórico arquivado", key="com_historico")
+    opcoes_mes = list(datas.meses)
+    limites = datas.limites()
+    if com_historico:
+        opcoes_mes = sorted(set(opcoes_mes) | set(meses_arquivados))
+        limites = None
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    meses = col1.multiselect("📅 Mês", options=opcoes_mes, format_func=rotulo_mes)
+    escolhidas = col2.date_input(
+        "🗓️ Período", value=(), format="DD/MM/YYYY",
+        min_value=limites[0] if limites else None, max_value=limites[1] if limites else None)
+    filtros = {
+        'STATUS': col3.multiselect("📌 Status", options=indice.opcoes.get('STATUS', [])),
+        'IMO': col4.multiselect("☣️ IMO", options=indice.opcoes.get('IMO', [])),
+        'TIPO DE CARGA': col5.multiselect(
+            "🚛 Tipo de Carga", options=indice.opcoes.get('TIPO DE CARGA', [])),
     }
-)
+    consulta = st.text_input(
+        "🔎 Buscar", key="busca",
+        placeholder="Processo, container, DI, nota fiscal, PO ou motorista")
+
+    # Período [início, fim + 1 dia); com só o início escolhido vai até o fim dos dados
+    periodo = None
+    if escolhidas:
+        fim = (pd.Timestamp(escolhidas[1]) + pd.Timedelta(days=1) if len(escolhidas) > 1
+               else pd.Timestamp.max)
+        periodo = (pd.Timestamp(escolhidas[0]), fim)
+
+    # Aplicar filtros (df_filtrado é só leitura: sem filtro é o próprio df compartilhado)
+    with etapa('filtros') as medicao:
+        restricao = datas.selecionar(meses, periodo)
+        achadas = busca.indice_busca(df).buscar(consulta)
+        if achadas is not None:
+            restricao = achadas if restricao is None else np.intersect1d(restricao, achadas)
+        linhas = indice.linhas(filtros, restricao)
+        df_filtrado = medicao.df(df if linhas is None else df.iloc[linhas])
+
+    # Métricas (somadas a partir do cubo pré-agregado; período com dias avulsos ou busca soma as linhas)
+    with etapa('metricas'):
+        if periodo is None and achadas is None:
+            kpis = dados.derivado(df, 'cubo', CuboMetricas).kpis(filtros, meses)
+        else:
+            kpis = kpis_linhas(df_filtrado)
+
+    # Histórico: só as partições dos meses/período filtrados são lidas
+    arquivados = None
+    if com_historico:
+        with etapa('historico_ler') as medicao:
+            arquivados = medicao.df(historico.ler_historico(meses, periodo))
+    if arquivados is not None:
+        hashes = dados.derivado(
+            df, 'hashes_linhas', lambda d: historico.hash_linhas(d, list(d.columns)))
+        arquivados = historico.sem_repetidas(
+            historico.filtrar(arquivados, filtros, periodo), df, hashes)
+        if achadas is not None:
+            arquivados = arquivados[busca.contem(arquivados, consulta)]
+        for nome, valor in kpis_linhas(arquivados).items():
+            kpis[nome] += valor
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("💰 Total Transportado", format_number(kpis['valor']))
+    m2.metric("📄 NFs Emitidas", f"{kpis['nfs']}")
+    m3.metric("⚖️ Peso Total", format_number(kpis['peso'], "kg"))
+    m4.metric("🟡 Aguardando", kpis['aguardando'])
+    m5.metric("✅ Concluídos", kpis['concluidos'])
+
+    # Painel de alertas
+    hoje = pd.Timestamp(datetime.datetime.now().date())
+    if 'DATA' in df.columns and 'STATUS' in df.columns:
+        painel_pendentes(df, hoje, linhas)
+
+    # Exibir a tabela (paginada; só a página visível é formatada)
+    if arquivados is not None and len(arquivados):
+        df_filtrado = pd.concat([df_filtrado, arquivados], ignore_index=True)
+        tabela_paginada(df_filtrado)
+    else:
+        tabela_paginada(df, linhas)
+
+    # Exportação: o arquivo só é gerado no clique, fora da reexecução da página
+    c1, c2, _ = st.columns([1, 1, 3])
+    for coluna, formato in [(c1, 'csv'), (c2, 'xlsx')]:
+        coluna.download_button(
+            f"⬇️ Exportar {formato.upper()}",
+            data=exportar.gerador(df_filtrado, formato),
+            file_name=exportar.nome_arquivo(formato),
+            mime=exportar.tipo_mime(formato),
+            on_click="ignore",
+            width="stretch",
+            disabled=df_filtrado.empty,
+        )
+
+
+painel(df)
+
+# Desempenho: painel oculto de admin e arquivo de métricas
+instrumentacao.registro().registrar('pagina', time.perf_counter() - inicio_pagina)
+instrumentacao.painel_admin(df)
+instrumentacao.registro().gravar_se_preciso()
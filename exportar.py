@@ -0,0 +1,105 @@
+import io
+
+import pandas as pd
+
+# Exportação dos lançamentos filtrados em CSV ou XLSX. O arquivo é escrito em
+# blocos de LINHAS_POR_BLOCO (nunca uma cópia formatada do df inteiro) e só
+# quando o usuário clica no download: o st.download_button chama a função numa
+# thread separada, sem travar a reexecução da sessão.
+
+LINHAS_POR_BLOCO = 20000
+
+COLUNAS = ['STATUS', 'DATA', 'Nº DI', 'PROCESSO', 'PO', 'TERMINAL', 'TIPO DE CARGA',
+           'Nº CONTAINER', 'PRODUTO', 'QTD[VOLUME]', 'MOTORISTA', 'PESO', 'IMO', 'DAST',
+           'NOTA FISCAL', 'VALOR NF']
+
+# Formatos do Excel para as colunas tipadas
+FORMATOS_XLSX = {
+    'DATA': 'DD/MM/YYYY',
+    'PESO': '#,##0',
+    'VALOR NF': '#,##0.00',
+}
+
+
+def _blocos(df):
+    for inicio in range(0, len(df), LINHAS_POR_BLOCO):
+        yield inicio, df.iloc[inicio:inicio + LINHAS_POR_BLOCO]
+
+
+def _colunas(df):
+    return [c for c in COLUNAS if c in df.columns]
+
+
+def gravar_csv(df, destino):
+    """CSV no padrão do Excel em português: ';' entre campos e vírgula decimal."""
+    texto = io.TextIOWrapper(destino, encoding='utf-8-sig', newline='')
+    colunas = _colunas(df)
+    for inicio, bloco in _blocos(df[colunas]):
+        bloco.to_csv(texto, sep=';', decimal=',', date_format='%d/%m/%Y',
+                     index=False, header=inicio == 0)
+    texto.flush()
+    texto.detach()
+
+
+def gravar_xlsx(df, destino):
+    """XLSX com o openpyxl em modo write-only (as linhas vão direto para o arquivo).
+
+    Com o lxml instalado o openpyxl grava bem mais rápido.
+    """
+    # Importado só no primeiro XLSX: a página não paga o openpyxl ao abrir
+    from openpyxl import Workbook
+
+    livro = Workbook(write_only=True)
+    escrever_aba(livro, "Sertranding", df[_colunas(df)])
+    livro.save(destino)
+
+
+def escrever_aba(livro, nome, df):
+    """Acrescenta ao livro write-only uma aba com as colunas de df (cabeçalho + linhas)."""
+    from openpyxl.cell import WriteOnlyCell
+
+    aba = livro.create_sheet(nome)
+    colunas = list(df.columns)
+    aba.append(colunas)
+
+    formatos = [FORMATOS_XLSX.get(c) for c in colunas]
+    for _, bloco in _blocos(df):
+        # NaN/NaT e texto vazio viram células vazias (não são escritas)
+        valores = bloco.astype(object).where(bloco.notna() & (bloco != ''), None)
+        for linha in valores.itertuples(index=False, name=None):
+            celulas = []
+            for valor, formato in zip(linha, formatos):
+                if formato and valor is not None:
+                    celula = WriteOnlyCell(aba, value=valor)
+                    celula.number_format = formato
+                    celulas.append(celula)
+                else:
+                    celulas.append(valor)
+            aba.append(celulas)
+
+
+GRAVADORES = {
+    'csv': (gravar_csv, 'text/csv'),
+    'xlsx': (gravar_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def gerador(df, formato):
+    """Função sem argumentos para o data= do st.download_button (roda só no clique)."""
+    gravar, _ = GRAVADORES[formato]
+
+    def gerar():
+        arquivo = io.BytesIO()
+        gravar(df, arquivo)
+        return arquivo
+
+    return gerar
+
+
+def tipo_mime(formato):
+    return GRAVADORES[formato][1]
+
+
+def nome_arquivo(formato, agora=None):
+    agora = agora or pd.Timestamp.now()
+    return f"sertranding_{agora:%Y-%m-%d_%H%M}.{formato}"
@@ -0,0 +1,249 @@
+import csv
+import datetime
+import sqlite3
+
+import numpy as np
+import streamlit as st
+
+import config
+from cliente_sheets import ClienteSheets
+from instrumentacao import etapa
+
+# Fontes de dados da aba Sertranding. Todas devolvem as células cruas, como
+# texto do jeito que aparecem na planilha: ler_grade() a aba inteira por
+# linhas, ler_colunas() só as colunas pedidas, uma lista por coluna. O parse
+# para tipos fica em dados.py.
+
+# Linhas varridas no topo da aba para achar o cabeçalho
+LINHAS_CABECALHO = 20
+
+
+def _celula(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, (datetime.datetime, datetime.date)):
+        return valor.strftime('%d/%m/%Y')
+    if isinstance(valor, bool):
+        return str(valor).upper()
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, (int, float)):
+        # Vírgula decimal, como a planilha mostra
+        return str(valor).replace('.', ',')
+    return str(valor)
+
+
+def _retangular(linhas):
+    linhas = [[_celula(v) for v in linha] for linha in linhas]
+    largura = max((len(linha) for linha in linhas), default=0)
+    return [linha + [''] * (largura - len(linha)) for linha in linhas]
+
+
+def letra_coluna(n):
+    letras = ''
+    while n:
+        n, resto = divmod(n - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def numero_coluna(letras):
+    """Inverso de letra_coluna: 'A' -> 1, 'AA' -> 27."""
+    n = 0
+    for c in letras:
+        n = n * 26 + ord(c) - 64
+    return n
+
+
+def faixas_contiguas(linhas):
+    """[(inicio, fim)] das linhas da aba, em ordem, juntando as vizinhas."""
+    faixas = []
+    for n in sorted(int(n) for n in linhas):
+        if faixas and faixas[-1][1] == n - 1:
+            faixas[-1] = (faixas[-1][0], n)
+        else:
+            faixas.append((n, n))
+    return faixas
+
+
+class GradeColunar:
+    def __init__(self, linha_cabecalho, nomes, letras, valores):
+        # Número (1-based) da linha do cabeçalho na aba
+        self.linha_cabecalho = linha_cabecalho
+        self.nomes = nomes
+        # Letra de cada coluna na aba, para as leituras por faixa
+        self.letras = letras
+        # Uma lista por coluna, começando na linha abaixo do cabeçalho
+        self.valores = valores
+
+
+def colunar(grade, nomes=None):
+    """Grade por linhas -> GradeColunar com as colunas pedidas (None: todas as não vazias)."""
+    if not grade:
+        return GradeColunar(1, [], [], [])
+    matriz = np.array(grade, dtype=object)
+    preenchida = np.char.strip(matriz.astype(str)) != ''
+    linhas = np.flatnonzero(preenchida.any(axis=1))
+    if not len(linhas):
+        return GradeColunar(1, [], [], [])
+    cab = int(linhas[0])
+    cabecalho = list(matriz[cab])
+
+    if nomes is None:
+        indices = [int(j) for j in np.flatnonzero(preenchida.any(axis=0))]
+        nomes = [cabecalho[j] if cabecalho[j].strip() != '' else f'Coluna_{i}'
+                 for i, j in enumerate(indices)]
+    else:
+        nomes = [n for n in nomes if n in cabecalho]
+        indices = [cabecalho.index(n) for n in nomes]
+    return GradeColunar(cab + 1, nomes, [letra_coluna(j + 1) for j in indices],
+                        [matriz[cab + 1:, j].tolist() for j in indices])
+
+
+class FonteDados:
+    # Fontes incrementais sabem ler faixas A1 avulsas (ver sincronizacao.py)
+    incremental = False
+    # Fontes que aceitam lançamentos feitos pela página (ver escrita.py)
+    gravavel = False
+
+    def ler_grade(self):
+        raise NotImplementedError
+
+    def ler_colunas(self, nomes=None):
+        return colunar(self.ler_grade(), nomes)
+
+    def ler_faixas(self, faixas, colunas=False):
+        raise NotImplementedError
+
+
+@st.cache_resource
+def conectar_planilha():
+    # Só roda quando o cache_resource não tem a conexão: cada medição é uma falta
+    with etapa('sheets_conectar'):
+        # Só a fonte Google usa o pygsheets (e ele demora para importar)
+        import pygsheets
+
+        if config.GOOGLE_CREDENCIAIS:
+            gc = pygsheets.authorize(service_file=config.GOOGLE_CREDENCIAIS)
+        else:
+            gc = pygsheets.authorize(service_account_env_var='gcp_service_account')
+
+        arquivo = gc.open_by_url(config.PLANILHA_URL)
+        aba = arquivo.worksheet_by_title(config.PLANILHA_ABA)
+    return aba
+
+
+@st.cache_resource
+def cliente_planilha():
+    """Cliente único por processo: limita a taxa, junta leituras iguais e tenta de novo."""
+    return ClienteSheets(conectar_planilha, config.SHEETS_REQ_POR_MINUTO,
+                         config.SHEETS_TENTATIVAS, config.SHEETS_ESPERA_BASE)
+
+
+class FonteGoogleSheets(FonteDados):
+    incremental = True
+    gravavel = True
+
+    def __init__(self):
+        self._cabecalho = None
+
+    @property
+    def aba(self):
+        return cliente_planilha()
+
+    def ler_grade(self):
+        return self.aba.get_all_values()
+
+    def ler_faixas(self, faixas, colunas=False):
+        return self.aba.get_values_batch(faixas, majdim='COLUMNS' if colunas else 'ROWS')
+
+    def cabecalho(self, recarregar=False):
+        """(linha do cabeçalho, {nome: letra da coluna}), guardado entre as leituras."""
+        if self._cabecalho is None or recarregar:
+            topo = self.ler_faixas([f"1:{LINHAS_CABECALHO}"])[0]
+            for n, linha in enumerate(topo, 1):
+                if any(str(cell).strip() for cell in linha):
+                    self._cabecalho = (n, {nome: letra_coluna(j + 1)
+                                           for j, nome in reversed(list(enumerate(linha)))
+                                           if str(nome).strip()})
+                    break
+            else:
+                self._cabecalho = (1, {})
+        return self._cabecalho
+
+    def ler_colunas(self, nomes=None):
+        if nomes is None:
+            return super().ler_colunas(nomes)
+        # Uma coluna inteira por faixa, todas numa única chamada à API
+        for tentativa in range(2):
+            cab, letras = self.cabecalho(recarregar=tentativa > 0)
+            presentes = [n for n in nomes if n in letras]
+            blocos = self.ler_faixas([f"{letras[n]}:{letras[n]}" for n in presentes],
+                                     colunas=True)
+            valores = [[str(v) for v in bloco[0]] if bloco else [] for bloco in blocos]
+            if all(len(v) >= cab and v[cab - 1] == n for n, v in zip(presentes, valores)):
+                return GradeColunar(cab, presentes, [letras[n] for n in presentes],
+                                    [v[cab:] for v in valores])
+        raise ValueError("Cabeçalho da aba mudou durante a leitura")
+
+
+class FonteArquivo(FonteDados):
+    """Cópia local da aba em CSV ou XLSX (primeira aba, ou a de nome PLANILHA_ABA)."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def ler_grade(self):
+        if self.caminho.lower().endswith(('.xlsx', '.xlsm')):
+            return self._ler_xlsx()
+        return self._ler_csv()
+
+    def _ler_csv(self):
+        with open(self.caminho, newline='', encoding='utf-8-sig') as f:
+            amostra = f.read(64 * 1024)
+            f.seek(0)
+            try:
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+            except csv.Error:
+                dialeto = csv.excel
+            return _retangular(csv.reader(f, dialeto))
+
+    def _ler_xlsx(self):
+        import openpyxl
+
+        livro = openpyxl.load_workbook(self.caminho, read_only=True, data_only=True)
+        try:
+            if config.PLANILHA_ABA in livro.sheetnames:
+                planilha = livro[config.PLANILHA_ABA]
+            else:
+                planilha = livro.worksheets[0]
+            return _retangular(planilha.iter_rows(values_only=True))
+        finally:
+            livro.close()
+
+
+class FonteSQLite(FonteDados):
+    """Tabela SQLite com uma coluna por coluna da aba, na mesma ordem."""
+
+    def __init__(self, caminho, tabela=None):
+        self.caminho = caminho
+        self.tabela = tabela or config.SQLITE_TABELA
+
+    def ler_grade(self):
+        with sqlite3.connect(self.caminho) as conexao:
+            cursor = conexao.execute(f'SELECT * FROM "{self.tabela}"')
+            header = [c[0] for c in cursor.description]
+            return _retangular([header, *cursor])
+
+
+@st.cache_resource
+def fonte_configurada():
+    tipo = config.FONTE.lower()
+    if tipo in ('google', 'sheets'):
+        return FonteGoogleSheets()
+    if tipo in ('csv', 'xlsx', 'arquivo'):
+        return FonteArquivo(config.FONTE_CAMINHO)
+    if tipo == 'sqlite':
+        return FonteSQLite(config.FONTE_CAMINHO)
+    raise ValueError(f"Fonte de dados desconhecida: {config.FONTE!r}")
+
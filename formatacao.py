@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Leitura e formatação de números no padrão brasileiro (1.234,56) em colunas
+# inteiras de uma vez, com as funções de texto do Arrow em vez de .apply.
+
+
+# Pedaços que aparecem nas células de valor/peso e saem por substituição
+# literal, bem mais barata que a regex
+_RUIDO = ['R$', 'kg', 'KG', ' ', '\xa0', '.']
+
+
+def _para_float(texto, serie):
+    texto = pc.replace_substring(texto, ',', '.')
+    texto = pc.if_else(pc.equal(texto, ''), pa.scalar(None, pa.string()), texto)
+    valores = pc.cast(texto, pa.float64())
+    return pd.Series(valores.to_numpy(zero_copy_only=False), index=serie.index)
+
+
+def parse_numero(serie):
+    """'R$ 1.234,56' -> 1234.56 para a coluna toda. O que não for número vira NaN."""
+    texto = pa.array(serie.astype(object).where(serie.notna(), None).to_numpy(),
+                     type=pa.string(), from_pandas=True)
+    limpo = texto
+    for ruido in _RUIDO:
+        limpo = pc.replace_substring(limpo, ruido, '')
+    if pc.any(pc.match_substring_regex(limpo, r'[^0-9,\-]')).as_py():
+        limpo = pc.replace_substring_regex(texto, r'[^0-9,\-]+', '')
+    try:
+        return _para_float(limpo, serie)
+    except pa.ArrowInvalid:
+        # Sobrou lixo do tipo "1,2,3" ou "-": deixa o pandas converter em NaN
+        limpo = pc.replace_substring(limpo, ',', '.')
+        return pd.to_numeric(pd.Series(limpo.to_numpy(zero_copy_only=False), index=serie.index),
+                             errors='coerce').astype(float)
+
+
+def _agrupar_milhar(inteiro):
+    # Monta "1.234.567" juntando grupos de 3 dígitos, do maior para o menor
+    partes = []
+    grupos = max(int(np.log10(max(inteiro.max(initial=0), 1))) // 3 + 1, 1)
+    for k in range(grupos - 1, -1, -1):
+        base = 1000 ** k
+        grupo = pc.cast(pa.array((inteiro // base) % 1000), pa.string())
+        cheio = pc.utf8_lpad(grupo, 3, '0')
+        if k == 0:
+            partes.append(pc.if_else(pa.array(inteiro >= 1000), cheio, grupo))
+        else:
+            parcial = pc.if_else(pa.array(inteiro >= base), grupo,
+                                 pa.scalar(None, pa.string()))
+            partes.append(pc.if_else(pa.array(inteiro >= base * 1000), cheio, parcial))
+    return pc.binary_join_element_wise(*partes, '.', null_handling='skip')
+
+
+def formatar_numero(serie, casas=2, prefixo='', sufixo=''):
+    """Coluna numérica -> texto pt-BR ("R$ 1.234,56"). NaN vira texto vazio."""
+    valores = serie.to_numpy(dtype=float, na_value=np.nan)
+    vazio = np.isnan(valores)
+    escala = 10 ** casas
+    centavos = np.round(np.abs(np.where(vazio, 0, valores)) * escala).astype(np.int64)
+
+    partes = [prefixo, pc.if_else(pa.array((valores < 0) & (centavos > 0)), '-', ''),
+              _agrupar_milhar(centavos // escala)]
+    if casas:
+        decimais = pc.cast(pa.array(centavos % escala), pa.string())
+        partes += [',', pc.utf8_lpad(decimais, casas, '0')]
+    texto = pc.binary_join_element_wise(*partes, sufixo, '')
+    texto = pc.if_else(pa.array(vazio), '', texto)
+    return pd.Series(pd.arrays.ArrowExtensionArray(texto), index=serie.index)
+
+
+def formatar_moeda(serie, casas=2):
+    return formatar_numero(serie, casas, prefixo='R$ ')
+
+
+def formatar_peso(serie):
+    return formatar_numero(serie, 0, sufixo=' kg')
+
+
+def formatar_br(valor, casas=2):
+    return f"{valor:,.{casas}f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def format_number(value, prefix='R$'):
+    if pd.isna(value):
+        return f"{prefix} 0,00"
+    for unit in ['', ' mil']:
+        if value < 1000:
+            return f"{prefix} {formatar_br(value)}{unit}"
+        value /= 1000
+    return f"{prefix} {formatar_br(value)} milhões"
@@ -0,0 +1,99 @@
+import streamlit as st
+import pandas as pd
+import datetime
+import time
+
+import atualizador
+import dados
+import historico
+import instrumentacao
+from instrumentacao import etapa
+from series import DIMENSOES, GRANULARIDADES, MAX_PONTOS, series_pagina
+
+inicio_pagina = time.perf_counter()
+
+st.markdown("""
+<div style='display: flex; align-items: center; gap: 10px; font-size: 30px; font-weight: bold;'>
+    <span style='color: green;'>Gráficos</span> <span style='color: blue;'>Sertranding</span>
+    <img width="40" height="40" src="https://img.icons8.com/officel/80/cargo-ship.png"/>
+</div>
+<hr style='border-top: 1px solid blue; margin-top: 4px;' />
+""", unsafe_allow_html=True)
+
+try:
+    with etapa('carregar') as medicao:
+        df = medicao.df(dados.carregar_dados())
+except Exception:
+    st.error("❌ Não foi possível acessar a planilha e não há uma cópia local dos dados. "
+             "Tente novamente em alguns minutos.")
+    st.stop()
+atualizador.iniciar_atualizador()
+
+cache = dados.cache_dados()
+carregado_em = datetime.datetime.fromtimestamp(cache.carregado_em)
+st.caption(f"Dados atualizados em {carregado_em.strftime('%d/%m/%Y %H:%M:%S')} (versão {cache.versao})")
+atualizador.aviso_nova_versao(cache.versao)
+
+METRICAS = {
+    'VALOR NF': "💰 Valor NF (R$)",
+    'PESO': "⚖️ Peso (kg)",
+    'NFs': "📄 NFs emitidas",
+}
+ABERTURAS = {
+    'TERMINAL': "🏗️ Terminal",
+    'TIPO DE CARGA': "🚛 Tipo de Carga",
+    'IMO': "☣️ IMO",
+}
+
+
+@st.fragment
+def graficos(df):
+    with etapa('graficos'):
+        _graficos(df)
+
+
+def _graficos(df):
+    com_historico = bool(historico.particoes()) and st.toggle(
+        "🗄️ Incluir histórico arquivado", key="graficos_historico")
+    with etapa('series'):
+        series = series_pagina(df, com_historico)
+
+    col1, col2, col3 = st.columns(3)
+    metrica = col1.selectbox("📊 Métrica", options=list(METRICAS), format_func=METRICAS.get)
+    pedida = col2.selectbox("🕒 Agrupar por", options=["Automático"] + list(GRANULARIDADES))
+    limites = series.limites()
+    escolhidas = col3.date_input(
+        "🗓️ Período", value=(), format="DD/MM/YYYY",
+        min_value=limites[0] if limites else None, max_value=limites[1] if limites else None)
+    inicio = fim = None
+    if escolhidas:
+        inicio = pd.Timestamp(escolhidas[0])
+        fim = pd.Timestamp(escolhidas[1]) + pd.Timedelta(days=1) if len(escolhidas) > 1 else None
+    pedida = None if pedida == "Automático" else pedida
+
+    # Evolução do total
+    tabela, usada = series.serie(None, metrica, pedida, inicio, fim)
+    st.subheader(f"{METRICAS[metrica]} por {usada.lower()}")
+    if pedida and usada != pedida:
+        st.caption(f"Intervalo longo: agrupado por {usada.lower()} "
+                   f"(no máximo {MAX_PONTOS} pontos por gráfico).")
+    st.line_chart(tabela, y=metrica, y_label=METRICAS[metrica], x_label="",
+                  width="stretch")
+
+    # Aberturas (cada categoria empilhada na mesma barra)
+    abas = st.tabs([ABERTURAS[d] for d in DIMENSOES])
+    for aba, dim in zip(abas, DIMENSOES):
+        with aba:
+            if (dim, 'Dia') not in series.agregados:
+                st.info(f"A planilha não tem a coluna {dim}.")
+                continue
+            tabela, _ = series.serie(dim, metrica, pedida, inicio, fim)
+            st.bar_chart(tabela, y_label=METRICAS[metrica], x_label="",
+                         width="stretch")
+
+
+graficos(df)
+
+instrumentacao.registro().registrar('pagina_graficos', time.perf_counter() - inicio_pagina)
+instrumentacao.painel_admin()
+instrumentacao.registro().gravar_se_preciso()
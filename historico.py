@@ -0,0 +1,206 @@
+import argparse
+import logging
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import streamlit as st
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Histórico dos lançamentos CONCLUÍDOS antigos, fora da planilha: um dataset
+# Parquet particionado por ano/mês (ANO=2024/MES=03/dados.parquet). A página
+# lê só as partições dos meses filtrados, com memory map, e junta com os
+# dados vivos da planilha.
+#
+# Arquivar: python historico.py [--meses 12] [--remover]
+# --remover apaga da planilha as linhas arquivadas (sem ele, só copia).
+
+_PARTICAO = re.compile(r"ANO=(\d{4})/MES=(\d{2})$")
+
+
+def pasta_particao(ano, mes, raiz=config.HISTORICO_PATH):
+    return os.path.join(raiz, f"ANO={ano}", f"MES={mes:02d}")
+
+
+def particoes(raiz=config.HISTORICO_PATH):
+    """(ano, mês) de cada partição gravada, em ordem."""
+    encontradas = []
+    if not os.path.isdir(raiz):
+        return encontradas
+    for pasta_ano in os.listdir(raiz):
+        caminho_ano = os.path.join(raiz, pasta_ano)
+        if not os.path.isdir(caminho_ano):
+            continue
+        for pasta_mes in os.listdir(caminho_ano):
+            achou = _PARTICAO.match(f"{pasta_ano}/{pasta_mes}")
+            if achou and os.path.exists(os.path.join(caminho_ano, pasta_mes, "dados.parquet")):
+                encontradas.append((int(achou[1]), int(achou[2])))
+    return sorted(encontradas)
+
+
+def meses_arquivados(raiz=config.HISTORICO_PATH):
+    """Meses (pd.Period) com partição gravada."""
+    return [pd.Period(year=ano, month=mes, freq='M') for ano, mes in particoes(raiz)]
+
+
+def assinatura(raiz=config.HISTORICO_PATH):
+    """(partição, modificado em) de todas as partições: muda quando o histórico é regravado."""
+    assinado = []
+    for ano, mes in particoes(raiz):
+        caminho = os.path.join(pasta_particao(ano, mes, raiz), "dados.parquet")
+        assinado.append((ano, mes, os.path.getmtime(caminho)))
+    return tuple(assinado)
+
+
+def arquivaveis(df, corte):
+    """Máscara das linhas CONCLUÍDAS com DATA anterior ao corte."""
+    concluido = df['STATUS'].astype(str).str.upper() == 'CONCLUÍDO'
+    return (concluido & (df['DATA'] < corte)).to_numpy()
+
+
+def arquivar(df, raiz=config.HISTORICO_PATH):
+    """Acrescenta as linhas do df às partições do mês de cada DATA; devolve quantas eram novas."""
+    df = df.reset_index(drop=True)
+    novas = 0
+    for (ano, mes), grupo in df.groupby([df['DATA'].dt.year, df['DATA'].dt.month]):
+        pasta = pasta_particao(int(ano), int(mes), raiz)
+        caminho = os.path.join(pasta, "dados.parquet")
+        os.makedirs(pasta, exist_ok=True)
+        if os.path.exists(caminho):
+            existente = pd.read_parquet(caminho)
+            juntos = pd.concat([existente, grupo], ignore_index=True).drop_duplicates()
+            novas += len(juntos) - len(existente)
+        else:
+            juntos = grupo.drop_duplicates()
+            novas += len(juntos)
+        temporario = f"{caminho}.tmp"
+        juntos.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+    return novas
+
+
+@st.cache_resource(max_entries=64)
+def _ler_particao(caminho, modificado_em):
+    # modificado_em entra na chave: partição regravada é lida de novo
+    return pq.read_table(caminho, memory_map=True).to_pandas()
+
+
+def ler_historico(meses=None, periodo=None, raiz=config.HISTORICO_PATH):
+    """Lançamentos arquivados dos meses (pd.Period) e do período (inicio, fim) pedidos.
+
+    Só as partições que cruzam a seleção são lidas; sem seleção lê todas.
+    """
+    tabelas = []
+    for ano, mes in particoes(raiz):
+        particao = pd.Period(year=ano, month=mes, freq='M')
+        if meses and particao not in meses:
+            continue
+        if periodo is not None and (particao.end_time < periodo[0]
+                                    or particao.start_time >= periodo[1]):
+            continue
+        caminho = os.path.join(pasta_particao(ano, mes, raiz), "dados.parquet")
+        tabelas.append(_ler_particao(caminho, os.path.getmtime(caminho)))
+    if not tabelas:
+        return None
+    return pd.concat(tabelas, ignore_index=True)
+
+
+def filtrar(historico, filtros, periodo=None):
+    """Mesmos filtros da página (os meses já vieram da escolha das partições)."""
+    selecao = np.ones(len(historico), dtype=bool)
+    for nome, selecionados in filtros.items():
+        if selecionados and nome in historico.columns:
+            selecao &= historico[nome].isin(selecionados).to_numpy()
+    if periodo is not None:
+        selecao &= ((historico['DATA'] >= periodo[0]) & (historico['DATA'] < periodo[1])).to_numpy()
+    return historico[selecao]
+
+
+def hash_linhas(df, colunas):
+    return pd.util.hash_pandas_object(df[colunas].astype(str), index=False).to_numpy()
+
+
+def sem_repetidas(historico, df, hashes_df):
+    """Tira do histórico as linhas que ainda estão na planilha (arquivadas sem --remover)."""
+    if list(historico.columns) != list(df.columns):
+        return historico
+    repetida = np.isin(hash_linhas(historico, list(df.columns)), hashes_df)
+    return historico[~repetida]
+
+
+def conferir_na_planilha(selecao):
+    """Linhas da seleção que ainda estão na aba com o mesmo PROCESSO e CONCLUÍDAS.
+
+    Relê PROCESSO e STATUS das linhas numa só chamada, logo antes de apagar:
+    se alguém inseriu, apagou ou ordenou linhas depois da leitura, os números
+    mudaram e a linha que está lá agora é outra.
+    """
+    import fontes
+
+    fonte = fontes.fonte_configurada()
+    _, letras = fonte.cabecalho(recarregar=True)
+    if 'PROCESSO' not in letras or 'STATUS' not in letras:
+        raise ValueError("A aba não tem as colunas PROCESSO e STATUS")
+    esperados = selecao['PROCESSO'].astype('string').fillna('').str.strip()
+    faixas = fontes.faixas_contiguas(selecao.index)
+    pedidas = [f"{letras[nome]}{inicio}:{letras[nome]}{fim}"
+               for inicio, fim in faixas for nome in ('PROCESSO', 'STATUS')]
+    blocos = fonte.ler_faixas(pedidas, colunas=True)
+    conferidas = []
+    # A API corta as células vazias do fim de cada faixa
+    colunas = [[str(v).strip() for v in bloco[0]] if bloco else [] for bloco in blocos]
+    for i, (inicio, fim) in enumerate(faixas):
+        processos, status = colunas[2 * i], colunas[2 * i + 1]
+        for n in range(inicio, fim + 1):
+            j = n - inicio
+            if (j < len(processos) and processos[j] == esperados[n]
+                    and j < len(status) and status[j].upper() == 'CONCLUÍDO'):
+                conferidas.append(n)
+    return conferidas
+
+
+def remover_da_planilha(selecao):
+    """Apaga da aba as linhas da seleção que conferem; devolve quantas foram apagadas."""
+    import fontes
+
+    linhas = conferir_na_planilha(selecao)
+    if linhas:
+        # Numa única batchUpdate, de baixo para cima
+        fontes.cliente_planilha().apagar_linhas(list(reversed(fontes.faixas_contiguas(linhas))))
+    return len(linhas)
+
+
+def main():
+    import dados
+
+    parser = argparse.ArgumentParser(description="Arquiva lançamentos CONCLUÍDOS antigos em Parquet")
+    parser.add_argument("--meses", type=int, default=config.HISTORICO_MESES,
+                        help="arquiva o que tem DATA anterior a N meses atrás")
+    parser.add_argument("--remover", action="store_true",
+                        help="apaga da planilha as linhas arquivadas")
+    args = parser.parse_args()
+
+    # Leitura nova (não o snapshot): os números de linha precisam estar atuais para --remover
+    df, _ = dados.ler_planilha()
+    corte = pd.Timestamp.now().normalize() - pd.DateOffset(months=args.meses)
+    selecao = df[arquivaveis(df, corte)]
+    novas = arquivar(selecao)
+    print(f"{len(selecao)} linhas anteriores a {corte:%d/%m/%Y}, {novas} novas no histórico")
+
+    if args.remover and len(selecao):
+        if config.FONTE != "google":
+            parser.error("--remover só funciona com a planilha do Google")
+        removidas = remover_da_planilha(selecao)
+        print(f"{removidas} linhas removidas da planilha")
+        if removidas < len(selecao):
+            print(f"{len(selecao) - removidas} linhas mudaram de lugar na aba depois da leitura "
+                  "e ficaram lá; rode de novo para removê-las")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+# Índices dos filtros da página Sertranding, montados uma vez por versão dos
+# dados. Nas colunas categóricas cada valor vira um bitmap (np.packbits):
+# qualquer combinação de filtros é um OR dentro da coluna e um AND entre
+# colunas, sem copiar o DataFrame. A DATA é ordenada uma vez e cada mês ou
+# período vira uma busca binária que devolve uma fatia contígua da ordem.
+
+MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho',
+         'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+
+def rotulo_mes(periodo):
+    return f"{MESES[periodo.month - 1]}/{periodo.year}"
+
+
+def _colunas_filtro(df):
+    colunas = {}
+    for col in ['STATUS', 'IMO', 'TIPO DE CARGA', 'TERMINAL']:
+        if col in df.columns:
+            colunas[col] = df[col]
+    return colunas
+
+
+class IndiceFiltros:
+    def __init__(self, df):
+        self.n = len(df)
+        self.opcoes = {}
+        self.codigos = {}
+        self.bitmaps = {}
+        for nome, serie in _colunas_filtro(df).items():
+            # factorize mantém a ordem de aparição, como o .unique() de antes
+            codigos, valores = pd.factorize(serie)
+            self.codigos[nome] = codigos
+            self.opcoes[nome] = list(valores)
+            self.bitmaps[nome] = {
+                valor: np.packbits(codigos == i) for i, valor in enumerate(valores)}
+
+    def bitmap(self, filtros):
+        """AND dos filtros preenchidos ({coluna: valores}); None quando não há filtro."""
+        resultado = None
+        for nome, selecionados in filtros.items():
+            if not selecionados:
+                continue
+            bitmaps = self.bitmaps.get(nome, {})
+            coluna = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+            for valor in selecionados:
+                if valor in bitmaps:
+                    coluna |= bitmaps[valor]
+            resultado = coluna if resultado is None else resultado & coluna
+        return resultado
+
+    def linhas(self, filtros, restricao=None):
+        """Posições (iloc) que passam nos filtros e, se dada, estão em restricao."""
+        bitmap = self.bitmap(filtros)
+        if bitmap is None and restricao is None:
+            return None
+        selecao = (np.ones(self.n, dtype=bool) if bitmap is None
+                   else np.unpackbits(bitmap, count=self.n).view(bool))
+        if restricao is not None:
+            permitidas = np.zeros(self.n, dtype=bool)
+            permitidas[restricao] = True
+            selecao &= permitidas
+        return np.flatnonzero(selecao)
+
+    def filtrar(self, df, filtros):
+        linhas = self.linhas(filtros)
+        return df if linhas is None else df.iloc[linhas]
+
+
+class IndiceDatas:
+    def __init__(self, df):
+        datas = df['DATA'].to_numpy() if 'DATA' in df.columns else np.array([], 'M8[ns]')
+        validas = ~np.isnat(datas)
+        # Só as datas preenchidas entram na ordem (NaT não cai em nenhum período)
+        posicoes = np.flatnonzero(validas)
+        ordem = np.argsort(datas[validas], kind='stable')
+        self.ordem = posicoes[ordem]
+        self.datas = datas[validas][ordem]
+        self.meses = (pd.PeriodIndex(self.datas, freq='M').unique()
+                      if len(self.datas) else pd.PeriodIndex([], freq='M'))
+
+    def _busca(self, instante):
+        return np.searchsorted(self.datas, pd.Timestamp(instante).to_datetime64()
+                               .astype(self.datas.dtype))
+
+    def entre(self, inicio, fim):
+        """Posições com inicio <= DATA < fim: uma fatia da ordem, achada por busca binária."""
+        return self.ordem[self._busca(inicio):self._busca(fim)]
+
+    def nos_meses(self, meses):
+        """Posições com DATA em algum dos meses (pd.Period) pedidos; None sem filtro."""
+        if not meses:
+            return None
+        fatias = [self.entre(m.start_time, (m + 1).start_time) for m in meses]
+        return np.concatenate(fatias)
+
+    def selecionar(self, meses=None, periodo=None):
+        """Meses (OR) e período (inicio, fim) combinados; None quando nenhum foi pedido."""
+        posicoes = self.nos_meses(meses)
+        if periodo is not None:
+            no_periodo = self.entre(*periodo)
+            posicoes = no_periodo if posicoes is None else np.intersect1d(posicoes, no_periodo)
+        return posicoes
+
+    def limites(self):
+        if not len(self.datas):
+            return None
+        return pd.Timestamp(self.datas[0]).date(), pd.Timestamp(self.datas[-1]).date()
@@ -0,0 +1,217 @@
+import collections
+import contextlib
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Tempo, linhas e memória de cada etapa da página (e das leituras da
+# planilha), mais acertos/faltas dos caches. Tudo fica num registro único
+# por processo, exibido no painel de admin (?admin=<SERTRANDING_ADMIN_CHAVE>)
+# e gravado em formato texto do Prometheus em config.METRICAS_PATH (serve
+# para o textfile collector do node_exporter: p50/p95 com histogram_quantile).
+
+LIMITES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Quantas medições recentes por etapa entram no p50/p95 do painel
+JANELA = 500
+
+
+class EstatisticaEtapa:
+    def __init__(self):
+        self.recentes = collections.deque(maxlen=JANELA)
+        self.buckets = [0] * len(LIMITES)
+        self.soma = 0.0
+        self.total = 0
+        self.linhas = None
+        self.memoria = None
+
+    def registrar(self, segundos, linhas, memoria):
+        self.recentes.append(segundos)
+        for i, limite in enumerate(LIMITES):
+            if segundos <= limite:
+                self.buckets[i] += 1
+        self.soma += segundos
+        self.total += 1
+        if linhas is not None:
+            self.linhas = linhas
+        if memoria is not None:
+            self.memoria = memoria
+
+
+class Registro:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.etapas = collections.defaultdict(EstatisticaEtapa)
+        self.cache = collections.Counter()
+        self.gravado_em = 0.0
+        # Um gravador por vez: todos usam o mesmo arquivo temporário
+        self.lock_gravacao = threading.Lock()
+
+    def registrar(self, nome, segundos, linhas=None, memoria=None):
+        with self.lock:
+            self.etapas[nome].registrar(segundos, linhas, memoria)
+
+    def cache_usado(self, nome, acerto):
+        with self.lock:
+            self.cache[(nome, 'hit' if acerto else 'miss')] += 1
+
+    def resumo(self):
+        with self.lock:
+            linhas = []
+            for nome, e in sorted(self.etapas.items()):
+                recentes = np.array(e.recentes)
+                linhas.append({
+                    'etapa': nome,
+                    'execuções': e.total,
+                    'p50 (ms)': np.percentile(recentes, 50) * 1000,
+                    'p95 (ms)': np.percentile(recentes, 95) * 1000,
+                    'última (ms)': recentes[-1] * 1000,
+                    'linhas': e.linhas,
+                    'memória (MB)': None if e.memoria is None else e.memoria / 2 ** 20,
+                })
+            caches = [{'cache': nome, 'resultado': resultado, 'total': total}
+                      for (nome, resultado), total in sorted(self.cache.items())]
+        return pd.DataFrame(linhas), pd.DataFrame(caches)
+
+    def prometheus(self):
+        saida = [
+            "# HELP sertranding_etapa_segundos Tempo de cada etapa da página",
+            "# TYPE sertranding_etapa_segundos histogram",
+        ]
+        with self.lock:
+            etapas = sorted(self.etapas.items())
+            for nome, e in etapas:
+                for limite, qtd in zip(LIMITES, e.buckets):
+                    saida.append(f'sertranding_etapa_segundos_bucket{{etapa="{nome}",le="{limite}"}} {qtd}')
+                saida.append(f'sertranding_etapa_segundos_bucket{{etapa="{nome}",le="+Inf"}} {e.total}')
+                saida.append(f'sertranding_etapa_segundos_sum{{etapa="{nome}"}} {e.soma:.6f}')
+                saida.append(f'sertranding_etapa_segundos_count{{etapa="{nome}"}} {e.total}')
+
+            saida += ["# HELP sertranding_etapa_linhas Linhas processadas na última execução",
+                      "# TYPE sertranding_etapa_linhas gauge"]
+            saida += [f'sertranding_etapa_linhas{{etapa="{nome}"}} {e.linhas}'
+                      for nome, e in etapas if e.linhas is not None]
+            saida += ["# HELP sertranding_etapa_memoria_bytes Memória do DataFrame da última execução",
+                      "# TYPE sertranding_etapa_memoria_bytes gauge"]
+            saida += [f'sertranding_etapa_memoria_bytes{{etapa="{nome}"}} {e.memoria}'
+                      for nome, e in etapas if e.memoria is not None]
+
+            saida += ["# HELP sertranding_cache_total Consultas aos caches",
+                      "# TYPE sertranding_cache_total counter"]
+            saida += [f'sertranding_cache_total{{cache="{nome}",resultado="{resultado}"}} {total}'
+                      for (nome, resultado), total in sorted(self.cache.items())]
+        return "\n".join(saida) + "\n"
+
+    def gravar(self, caminho=config.METRICAS_PATH):
+        with self.lock_gravacao:
+            self._gravar(caminho)
+
+    def _gravar(self, caminho):
+        # Chamado com self.lock_gravacao
+        self.gravado_em = time.time()
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(self.prometheus())
+        os.replace(temporario, caminho)
+
+    def gravar_se_preciso(self):
+        """Grava as métricas se passou o intervalo; chamado no fim das páginas."""
+        if not config.METRICAS_PATH:
+            return
+        # Outra sessão gravando agora: esta não precisa esperar
+        if not self.lock_gravacao.acquire(blocking=False):
+            return
+        try:
+            if time.time() - self.gravado_em > config.METRICAS_INTERVALO:
+                self._gravar(config.METRICAS_PATH)
+        except OSError:
+            # Falha nas métricas não derruba a página
+            logger.exception("Falha ao gravar as métricas em %s", config.METRICAS_PATH)
+        finally:
+            self.lock_gravacao.release()
+
+
+@st.cache_resource
+def registro():
+    return Registro()
+
+
+def memoria_df(df):
+    # Sem deep=True: as colunas de texto são Arrow e já vêm com o tamanho certo
+    return int(df.memory_usage(index=True).sum())
+
+
+def relatorio_memoria(df):
+    """Bytes por coluna com tudo como objeto Python (o formato antigo) e no df compacto."""
+    antes = df.astype(object).memory_usage(deep=True, index=False)
+    depois = df.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({
+        'tipo': df.dtypes.astype(str),
+        'antes (MB)': antes / 2 ** 20,
+        'depois (MB)': depois / 2 ** 20,
+    })
+    relatorio.loc['TOTAL'] = ['', antes.sum() / 2 ** 20, depois.sum() / 2 ** 20]
+    relatorio['redução'] = 1 - relatorio['depois (MB)'] / relatorio['antes (MB)']
+    return relatorio
+
+
+class Medicao:
+    def __init__(self):
+        self.linhas = None
+        self.memoria = None
+
+    def df(self, df):
+        """Anota linhas e memória do DataFrame produzido pela etapa."""
+        if df is not None:
+            self.linhas = len(df)
+            self.memoria = memoria_df(df)
+        return df
+
+
+@contextlib.contextmanager
+def etapa(nome):
+    medicao = Medicao()
+    inicio = time.perf_counter()
+    try:
+        yield medicao
+    finally:
+        registro().registrar(nome, time.perf_counter() - inicio, medicao.linhas, medicao.memoria)
+
+
+def painel_admin(df=None):
+    """Painel na barra lateral, só com ?admin=<chave> na URL."""
+    if not config.ADMIN_CHAVE or st.query_params.get("admin") != config.ADMIN_CHAVE:
+        return
+    reg = registro()
+    etapas, caches = reg.resumo()
+    with st.sidebar:
+        st.subheader("🛠️ Desempenho")
+        if etapas.empty:
+            st.caption("Nenhuma medição ainda.")
+            return
+        st.dataframe(etapas, hide_index=True, width="stretch",
+                     column_config={c: st.column_config.NumberColumn(format="%.1f")
+                                    for c in ['p50 (ms)', 'p95 (ms)', 'última (ms)', 'memória (MB)']})
+        if not caches.empty:
+            st.dataframe(caches, hide_index=True, width="stretch")
+        if config.METRICAS_PATH:
+            st.caption(f"Métricas Prometheus em `{config.METRICAS_PATH}`")
+        # Converte o df inteiro para objetos: só sob demanda
+        if df is not None and st.button("📦 Memória por coluna", key="admin_memoria"):
+            st.dataframe(relatorio_memoria(df), width="stretch",
+                         column_config={
+                             'antes (MB)': st.column_config.NumberColumn(format="%.2f"),
+                             'depois (MB)': st.column_config.NumberColumn(format="%.2f"),
+                             'redução': st.column_config.NumberColumn(format="percent"),
+                         })
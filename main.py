@@ -14,6 +14,7 @@ pg = st.navigation(
 
         "𝗛𝗼𝗺𝗲": [st.Page("homepage.py", title="🏢 Cotralti Corporation")],
         "Sertranding": [st.Page("exportacao.py", title="⚙️ Sertranding"),
+                        st.Page("graficos.py", title="📈 Gráficos"),
                         st.Page("aba_dados.py",
                                 title="📎 Lançamentos")],
     }
@@ -0,0 +1,63 @@
+import pandas as pd
+
+# Cubo com SUM(VALOR NF), SUM(PESO) e COUNT por ano-mês x STATUS x IMO x
+# TIPO DE CARGA, montado uma vez por versão dos dados. Os KPIs do topo da
+# página saem da soma das células que passam nos filtros, sem varrer linhas.
+# Um período com dias avulsos não cabe no cubo: aí os KPIs saem das linhas
+# filtradas (kpis_linhas).
+
+DIMENSOES = ['STATUS', 'IMO', 'TIPO DE CARGA']
+
+
+class CuboMetricas:
+    def __init__(self, df):
+        chaves = pd.DataFrame(index=df.index)
+        chaves['ANO_MES'] = df['DATA'].dt.to_period('M')
+        for col in DIMENSOES:
+            chaves[col] = df[col] if col in df.columns else ''
+
+        # Soma sempre em float64, mesmo com a coluna guardada em float32
+        valores = pd.DataFrame({
+            'VALOR NF': df['VALOR NF'].astype('float64') if 'VALOR NF' in df.columns else 0.0,
+            'PESO': df['PESO'].astype('float64') if 'PESO' in df.columns else 0.0,
+        }, index=df.index)
+        agrupado = valores.groupby([chaves[c] for c in chaves.columns], dropna=False)
+        cubo = agrupado.sum()
+        cubo['QTD'] = agrupado.size()
+        cubo = cubo.reset_index()
+
+        cubo['STATUS_UP'] = cubo['STATUS'].str.upper()
+        self.cubo = cubo
+
+    def celulas(self, filtros, meses=None):
+        selecao = pd.Series(True, index=self.cubo.index)
+        for nome, selecionados in filtros.items():
+            if selecionados and nome in self.cubo.columns:
+                selecao &= self.cubo[nome].isin(selecionados)
+        if meses:
+            selecao &= self.cubo['ANO_MES'].isin(meses)
+        return self.cubo[selecao]
+
+    def kpis(self, filtros, meses=None):
+        """KPIs dos filtros categóricos e dos meses (pd.Period) selecionados."""
+        celulas = self.celulas(filtros, meses)
+        por_status = celulas.groupby('STATUS_UP')['QTD'].sum()
+        return {
+            'valor': celulas['VALOR NF'].sum(),
+            'nfs': int(celulas['QTD'].sum()),
+            'peso': celulas['PESO'].sum(),
+            'aguardando': int(por_status.get('AGUARDANDO', 0)),
+            'concluidos': int(por_status.get('CONCLUÍDO', 0)),
+        }
+
+
+def kpis_linhas(df):
+    """Mesmos KPIs do cubo, somados direto nas linhas."""
+    status = df['STATUS'].astype(str).str.upper()
+    return {
+        'valor': df['VALOR NF'].astype('float64').sum() if 'VALOR NF' in df.columns else 0.0,
+        'nfs': len(df),
+        'peso': df['PESO'].astype('float64').sum() if 'PESO' in df.columns else 0.0,
+        'aguardando': int((status == 'AGUARDANDO').sum()),
+        'concluidos': int((status == 'CONCLUÍDO').sum()),
+    }
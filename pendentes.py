@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import dados
+from indice import IndiceDatas
+from instrumentacao import etapa
+
+# Painel "Processos Pendentes": os processos AGUARDANDO são calculados de uma
+# vez (sem iterrows), separados em faixas e exibidos como uma tabela paginada
+# por faixa, então o custo de renderização não cresce com a quantidade. A
+# janela "vencem nos próximos N dias" é uma busca binária no índice de datas.
+
+LINHAS_POR_PAGINA = 25
+JANELA_PADRAO = 7
+
+FAIXAS = {
+    'vencido': "❌ Vencidos",
+    'hoje': "⚠️ Vencem hoje",
+    'proximo': "📅 Próximos",
+    'sem_data': "❔ Sem data",
+}
+
+
+def calcular_pendentes(df, hoje):
+    aguardando = df['STATUS'].str.upper() == 'AGUARDANDO'
+    pendentes = df.loc[aguardando, ['DATA']]
+    pendentes['PROCESSO'] = (df.loc[aguardando, 'PROCESSO']
+                             if 'PROCESSO' in df.columns else '---')
+    dias = (pendentes['DATA'] - hoje).dt.days
+    pendentes['DIAS_RESTANTES'] = dias
+
+    faixa = np.select([dias < 0, dias == 0, dias > 0],
+                      ['vencido', 'hoje', 'proximo'], default='sem_data')
+    pendentes['FAIXA'] = faixa
+
+    texto_dias = dias.abs().astype('Int64').astype(str)
+    pendentes['SITUAÇÃO'] = np.select(
+        [faixa == 'vencido', faixa == 'hoje', faixa == 'proximo'],
+        ["vencido há " + texto_dias + " dias", "vence hoje", "faltam " + texto_dias + " dias"],
+        default="sem data")
+    return pendentes.sort_values('DIAS_RESTANTES', na_position='last')
+
+
+def pendentes_atuais(df, hoje):
+    """Pendentes do df inteiro, calculados uma vez por versão dos dados e por dia."""
+    return dados.derivado(df, 'pendentes', lambda d: calcular_pendentes(d, hoje), chave=hoje)
+
+
+def vencendo(df, hoje, dias, linhas=None):
+    """Pendentes com DATA de hoje até hoje + dias, entre as linhas (iloc) filtradas."""
+    datas = dados.derivado(df, 'datas', IndiceDatas)
+    janela = datas.entre(hoje, hoje + pd.Timedelta(days=dias + 1))
+    if linhas is not None:
+        janela = janela[np.isin(janela, linhas)]
+    return calcular_pendentes(df.iloc[janela], hoje)
+
+
+@st.fragment
+def painel_pendentes(df, hoje, linhas=None):
+    with etapa('pendentes') as medicao:
+        pendentes = pendentes_atuais(df, hoje)
+        if linhas is not None:
+            # Filtrados: só os pendentes das linhas que passaram no filtro
+            pendentes = pendentes[pendentes.index.isin(df.index[linhas])]
+        medicao.df(pendentes)
+
+    with st.expander(f"📌 Processos Pendentes ({len(pendentes)})", expanded=False):
+        if pendentes.empty:
+            st.success("✅ Nenhum processo com status 'AGUARDANDO'.")
+            return
+
+        dias = st.number_input("⏳ Vencem nos próximos (dias)", min_value=0, max_value=365,
+                               value=JANELA_PADRAO, key="pendentes_janela")
+        with etapa('pendentes_janela') as medicao:
+            proximos = medicao.df(vencendo(df, hoje, dias, linhas))
+        ate = hoje + pd.Timedelta(days=dias)
+        st.caption(f"{len(proximos)} processo(s) vencem até {ate.strftime('%d/%m/%Y')}")
+        if not proximos.empty:
+            st.dataframe(
+                proximos.head(LINHAS_POR_PAGINA)[['PROCESSO', 'DATA', 'SITUAÇÃO']],
+                width="stretch",
+                hide_index=True,
+                column_config={
+                    "DATA": st.column_config.DateColumn("DATA", format="DD/MM/YYYY"),
+                }
+            )
+
+        contagem = pendentes['FAIXA'].value_counts()
+        faixas = [f for f in FAIXAS if contagem.get(f, 0)]
+        abas = st.tabs([f"{FAIXAS[f]} ({contagem[f]})" for f in faixas])
+        for faixa, aba in zip(faixas, abas):
+            with aba:
+                linhas = pendentes[pendentes['FAIXA'] == faixa]
+                paginas = max((len(linhas) - 1) // LINHAS_POR_PAGINA + 1, 1)
+                pagina = 1
+                if paginas > 1:
+                    pagina = st.number_input(
+                        f"Página (de {paginas})", min_value=1, max_value=paginas,
+                        value=1, key=f"pendentes_pagina_{faixa}")
+                inicio = (pagina - 1) * LINHAS_POR_PAGINA
+                st.dataframe(
+                    linhas.iloc[inicio:inicio + LINHAS_POR_PAGINA][
+                        ['PROCESSO', 'DATA', 'SITUAÇÃO']],
+                    width="stretch",
+                    hide_index=True,
+                    column_config={
+                        "DATA": st.column_config.DateColumn("DATA", format="DD/MM/YYYY"),
+                    }
+                )
@@ -0,0 +1,185 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import config
+import dados
+
+logger = logging.getLogger(__name__)
+
+# Qualidade dos dados: células que a tipagem descarta sem avisar (VALOR NF,
+# PESO e DATA que não são número/data viram NaN/NaT), campos-chave em branco,
+# STATUS/IMO fora da lista esperada e NOTA FISCAL/Nº CONTAINER repetidos.
+#
+# As células ilegíveis só podem ser vistas junto com o texto original: saem
+# na leitura da planilha (problemas_celulas, uma passada vetorizada por
+# coluna), acompanham os syncs incrementais e são gravadas ao lado do
+# snapshot. O resto sai do df tipado e o relatório completo é montado uma vez
+# por versão dos dados, só quando alguém abre a aba Lançamentos.
+
+TIPADAS = ['VALOR NF', 'PESO', 'DATA']
+CHAVES = ['PROCESSO', 'DATA', 'STATUS', 'NOTA FISCAL']
+UNICAS = ['NOTA FISCAL', 'Nº CONTAINER']
+
+ILEGIVEL = "valor ilegível"
+EM_BRANCO = "campo em branco"
+DESCONHECIDO = "valor desconhecido"
+REPETIDO = "valor repetido"
+
+# Linhas exibidas por vez na tabela da aba
+LINHAS_EXIBIDAS = 1000
+
+
+def _problemas(linhas, coluna, problema, valores):
+    return pd.DataFrame({'COLUNA': coluna, 'PROBLEMA': problema, 'VALOR': valores},
+                        index=pd.Index(linhas, name='LINHA'))
+
+
+def _vazio():
+    return _problemas([], pd.Series(dtype=str), pd.Series(dtype=str), pd.Series(dtype=str))
+
+
+def _texto(serie):
+    return serie.astype('string').fillna('').str.strip()
+
+
+def _mascara(serie, teste):
+    """teste(texto sem espaços nas pontas) -> máscara; numa categoria roda uma vez por valor."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        valores = pd.concat([_texto(pd.Series(serie.cat.categories)), pd.Series([''])],
+                            ignore_index=True)
+        # Código -1 (vazio) cai no '' acrescentado no fim
+        return teste(valores).to_numpy(dtype=bool)[serie.cat.codes.to_numpy()]
+    return teste(_texto(serie)).to_numpy(dtype=bool)
+
+
+def problemas_celulas(bruto, df):
+    """Células com texto que não virou número/data (bruto: texto da aba; df: o mesmo, tipado)."""
+    partes = []
+    for col in TIPADAS:
+        if col not in bruto.columns or col not in df.columns:
+            continue
+        texto = _texto(bruto[col])
+        ilegivel = ((texto != '') & df[col].isna()).to_numpy()
+        if ilegivel.any():
+            partes.append(_problemas(bruto.index[ilegivel], col, ILEGIVEL,
+                                     texto[ilegivel].to_numpy(dtype=object)))
+    return pd.concat(partes).sort_index(kind='stable') if partes else _vazio()
+
+
+def atualizar_celulas(anteriores, bruto, df):
+    """Problemas após um sync: os das linhas relidas (bruto) são trocados pelos de df."""
+    novos = problemas_celulas(bruto.loc[df.index], df)
+    if anteriores is None:
+        return novos
+    mantidos = anteriores[~anteriores.index.isin(bruto.index)]
+    return pd.concat([mantidos, novos]).sort_index(kind='stable')
+
+
+def relatorio(df, celulas=None):
+    """Todos os problemas do df, uma linha por (LINHA da aba, coluna, problema)."""
+    partes = [] if celulas is None else [celulas[celulas.index.isin(df.index)]]
+    ilegiveis = set() if celulas is None else set(celulas.index[celulas['COLUNA'] == 'DATA'])
+
+    for col in CHAVES:
+        if col not in df.columns:
+            continue
+        if col == 'DATA':
+            vazio = df['DATA'].isna().to_numpy() & ~df.index.isin(ilegiveis)
+        else:
+            vazio = _mascara(df[col], lambda texto: texto == '')
+        partes.append(_problemas(df.index[vazio], col, EM_BRANCO, ''))
+
+    for col, validos in [('STATUS', config.STATUS_VALIDOS), ('IMO', config.IMO_VALIDOS)]:
+        if col not in df.columns:
+            continue
+        desconhecido = _mascara(
+            df[col], lambda texto: (texto != '') & ~texto.str.upper().isin(validos))
+        partes.append(_problemas(df.index[desconhecido], col, DESCONHECIDO,
+                                 _texto(df[col][desconhecido]).to_numpy(dtype=object)))
+
+    for col in UNICAS:
+        if col not in df.columns:
+            continue
+        texto = _texto(df[col])
+        repetido = ((texto != '') & texto.duplicated(keep=False)).to_numpy()
+        partes.append(_problemas(df.index[repetido], col, REPETIDO,
+                                 texto[repetido].to_numpy(dtype=object)))
+
+    partes = [p for p in partes if len(p)]
+    if not partes:
+        return _vazio()
+    return pd.concat(partes).sort_index(kind='stable')
+
+
+def relatorio_atual(df):
+    """Relatório da versão atual dos dados (montado uma vez por versão)."""
+    return dados.derivado(df, 'qualidade', lambda d: relatorio(d, dados.cache_dados().problemas))
+
+
+# Gravação junto do snapshot
+
+def caminho_problemas(snapshot=config.SNAPSHOT_PATH):
+    return f"{os.path.splitext(snapshot)[0]}.qualidade.parquet"
+
+
+def salvar_problemas(celulas, snapshot=config.SNAPSHOT_PATH):
+    caminho = caminho_problemas(snapshot)
+    temporario = f"{caminho}.tmp"
+    celulas.to_parquet(temporario)
+    os.replace(temporario, caminho)
+
+
+def ler_problemas(snapshot=config.SNAPSHOT_PATH):
+    """Problemas gravados com o snapshot; None se não houver (snapshot antigo)."""
+    caminho = caminho_problemas(snapshot)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        return pd.read_parquet(caminho)
+    except Exception:
+        logger.exception("Arquivo %s ilegível, ignorando", caminho)
+        return None
+
+
+def painel_qualidade(df):
+    with st.spinner("Verificando os dados..."):
+        problemas = relatorio_atual(df)
+
+    st.subheader("🩺 Qualidade dos dados")
+    if dados.cache_dados().problemas is None:
+        st.caption("Valores ilegíveis aparecem depois da próxima leitura da planilha.")
+    if problemas.empty:
+        st.success("✅ Nenhum problema encontrado.")
+        return
+
+    contagem = problemas.groupby(['PROBLEMA', 'COLUNA']).size().rename('LINHAS').reset_index()
+    st.dataframe(contagem, hide_index=True, width="stretch")
+
+    tipos = st.multiselect("Problemas", options=sorted(problemas['PROBLEMA'].unique()),
+                           key="qualidade_tipos")
+    colunas = st.multiselect("Colunas", options=sorted(problemas['COLUNA'].unique()),
+                             key="qualidade_colunas")
+    selecao = np.ones(len(problemas), dtype=bool)
+    if tipos:
+        selecao &= problemas['PROBLEMA'].isin(tipos).to_numpy()
+    if colunas:
+        selecao &= problemas['COLUNA'].isin(colunas).to_numpy()
+    escolhidos = problemas[selecao]
+
+    # Junta PROCESSO/DATA da linha para achar o lançamento na planilha
+    contexto = [c for c in ['PROCESSO', 'DATA', 'STATUS'] if c in df.columns]
+    exibidos = escolhidos.head(LINHAS_EXIBIDAS).join(df[contexto])
+    st.caption(f"{len(escolhidos)} problema(s); mostrando {len(exibidos)}. "
+               "LINHA é o número da linha na aba.")
+    st.dataframe(
+        exibidos.reset_index(),
+        hide_index=True,
+        width="stretch",
+        column_config={
+            "DATA": st.column_config.DateColumn("DATA", format="DD/MM/YYYY"),
+        }
+    )
@@ -0,0 +1,196 @@
+import argparse
+import concurrent.futures
+import datetime
+import html
+import logging
+import os
+import re
+import time
+
+import pandas as pd
+from openpyxl import Workbook
+
+import config
+import dados
+from exportar import escrever_aba
+from formatacao import format_number
+from indice import IndiceDatas, IndiceFiltros, rotulo_mes
+from metricas import kpis_linhas
+from pendentes import FAIXAS, JANELA_PADRAO, calcular_pendentes
+
+# Relatórios da página Sertranding gerados fora do Streamlit, a partir do
+# snapshot local (nenhuma leitura da planilha nem do servidor web):
+#
+#   python relatorios.py --por mes terminal --formato html xlsx --saida relatorios/
+#
+# Cada fatia (um mês, um TERMINAL, um TIPO DE CARGA ou o geral) vira um
+# arquivo com os KPIs do topo da página e a lista de processos pendentes.
+# As fatias são divididas entre --processos processos; cada um lê o snapshot
+# uma vez e monta os mesmos índices da página para filtrar.
+
+POR = {
+    'geral': None,
+    'mes': 'DATA',
+    'terminal': 'TERMINAL',
+    'tipo': 'TIPO DE CARGA',
+}
+
+# Estado de cada processo do pool (preenchido por _iniciar)
+_df = None
+_indice = None
+_datas = None
+
+
+def _iniciar(snapshot):
+    global _df, _indice, _datas
+    # Fora do `streamlit run` os caches avisam a cada chamada
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    _df, _ = dados.ler_snapshot(snapshot)
+    if _df is None:
+        raise FileNotFoundError(f"Snapshot {snapshot} não encontrado")
+    _indice = IndiceFiltros(_df)
+    _datas = IndiceDatas(_df)
+
+
+def fatias(por):
+    """[(chave, rótulo)] das fatias de um tipo de relatório (valores do índice dos filtros)."""
+    coluna = POR[por]
+    if coluna is None:
+        return [(None, 'Geral')]
+    if coluna == 'DATA':
+        return [(str(mes), rotulo_mes(mes)) for mes in _datas.meses]
+    valores = [v for v in _indice.opcoes.get(coluna, []) if pd.notna(v) and str(v).strip()]
+    return [(valor, str(valor).strip()) for valor in sorted(valores, key=str)]
+
+
+def _linhas(por, chave):
+    coluna = POR[por]
+    if coluna is None:
+        return None
+    if coluna == 'DATA':
+        return _datas.nos_meses([pd.Period(chave, 'M')])
+    return _indice.linhas({coluna: [chave]})
+
+
+def resumo(df, hoje, dias=JANELA_PADRAO):
+    """(KPIs formatados, pendentes vencidos, pendentes que vencem em até dias)."""
+    kpis = kpis_linhas(df)
+    tabela_kpis = pd.DataFrame({
+        'Indicador': ["💰 Total Transportado", "📄 NFs Emitidas", "⚖️ Peso Total",
+                      "🟡 Aguardando", "✅ Concluídos"],
+        'Valor': [format_number(kpis['valor']), f"{kpis['nfs']}",
+                  format_number(kpis['peso'], "kg"), f"{kpis['aguardando']}",
+                  f"{kpis['concluidos']}"],
+    })
+    pendentes = calcular_pendentes(df, hoje)
+    colunas = ['PROCESSO', 'DATA', 'SITUAÇÃO']
+    vencidos = pendentes[pendentes['FAIXA'] == 'vencido'][colunas]
+    proximos = pendentes[pendentes['FAIXA'].isin(['hoje', 'proximo'])
+                         & (pendentes['DIAS_RESTANTES'] <= dias)][colunas]
+    return tabela_kpis, vencidos, proximos
+
+
+def _nome(por, chave, hoje):
+    parte = 'geral' if chave is None else re.sub(r'[^0-9A-Za-z]+', '_', chave).strip('_')
+    return f"sertranding_{por}_{parte or 'vazio'}_{hoje:%Y-%m-%d}"
+
+
+def _tabela_html(df):
+    if df.empty:
+        return "<p>Nenhum processo.</p>"
+    df = df.assign(DATA=df['DATA'].dt.strftime('%d/%m/%Y').fillna(''))
+    return df.to_html(index=False, border=0, classes="tabela")
+
+
+def gravar_html(caminho, titulo, kpis, vencidos, proximos, hoje, dias):
+    estilo = ("body{font-family:sans-serif;margin:24px}h1{color:#1f3a93}"
+              ".tabela{border-collapse:collapse}.tabela td,.tabela th{padding:4px 10px;"
+              "border-bottom:1px solid #ddd;text-align:left}")
+    partes = [
+        f"<html><head><meta charset='utf-8'><title>{html.escape(titulo)}</title>",
+        f"<style>{estilo}</style></head><body>",
+        f"<h1>{html.escape(titulo)}</h1>",
+        f"<p>Gerado em {datetime.datetime.now():%d/%m/%Y %H:%M} (referência {hoje:%d/%m/%Y})</p>",
+        kpis.to_html(index=False, header=False, border=0, classes="tabela"),
+        f"<h2>{FAIXAS['vencido']} ({len(vencidos)})</h2>",
+        _tabela_html(vencidos),
+        f"<h2>Vencem nos próximos {dias} dias ({len(proximos)})</h2>",
+        _tabela_html(proximos),
+        "</body></html>",
+    ]
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        arquivo.write("\n".join(partes))
+
+
+def gravar_xlsx(caminho, titulo, kpis, vencidos, proximos, hoje, dias):
+    # Mesmo caminho da exportação da página (write-only: listas longas não pesam)
+    livro = Workbook(write_only=True)
+    cabecalho = pd.DataFrame({'Indicador': ['Relatório', 'Referência'],
+                              'Valor': [titulo, f"{hoje:%d/%m/%Y}"]})
+    escrever_aba(livro, 'Resumo', pd.concat([cabecalho, kpis], ignore_index=True))
+    escrever_aba(livro, 'Vencidos', vencidos)
+    escrever_aba(livro, f'Próximos {dias} dias', proximos)
+    livro.save(caminho)
+
+
+GRAVADORES = {'html': gravar_html, 'xlsx': gravar_xlsx}
+
+
+def gerar(por, chave, rotulo, formatos, saida, hoje, dias):
+    """Gera os arquivos de uma fatia (roda num processo do pool); devolve os caminhos."""
+    linhas = _linhas(por, chave)
+    df = _df if linhas is None else _df.iloc[linhas]
+    kpis, vencidos, proximos = resumo(df, hoje, dias)
+    titulo = f"Sertranding — {rotulo}"
+    caminhos = []
+    for formato in formatos:
+        caminho = os.path.join(saida, f"{_nome(por, chave, hoje)}.{formato}")
+        GRAVADORES[formato](caminho, titulo, kpis, vencidos, proximos, hoje, dias)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatórios da Sertranding a partir do snapshot")
+    parser.add_argument('--por', nargs='+', choices=list(POR), default=['geral'],
+                        help="uma fatia por mês, TERMINAL, TIPO DE CARGA ou o geral")
+    parser.add_argument('--formato', nargs='+', choices=list(GRAVADORES), default=['html'])
+    parser.add_argument('--saida', default='relatorios')
+    parser.add_argument('--snapshot', default=config.SNAPSHOT_PATH)
+    parser.add_argument('--meses', type=int, help="com --por mes, só os N meses mais recentes")
+    parser.add_argument('--dias', type=int, default=JANELA_PADRAO,
+                        help="janela dos pendentes que vencem em breve")
+    parser.add_argument('--hoje', type=datetime.date.fromisoformat,
+                        default=datetime.date.today(), help="data de referência (AAAA-MM-DD)")
+    parser.add_argument('--processos', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    _iniciar(args.snapshot)
+    hoje = pd.Timestamp(args.hoje)
+    os.makedirs(args.saida, exist_ok=True)
+
+    tarefas = []
+    for por in args.por:
+        selecionadas = fatias(por)
+        if por == 'mes' and args.meses:
+            selecionadas = selecionadas[-args.meses:]
+        tarefas += [(por, chave, rotulo, args.formato, args.saida, hoje, args.dias)
+                    for chave, rotulo in selecionadas]
+
+    if args.processos <= 1 or len(tarefas) <= 1:
+        gerados = [gerar(*tarefa) for tarefa in tarefas]
+    else:
+        # Cada processo lê o snapshot uma vez; as tarefas só levam a chave da fatia
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(args.processos, len(tarefas)),
+                initializer=_iniciar, initargs=(args.snapshot,)) as pool:
+            gerados = list(pool.map(gerar, *zip(*tarefas)))
+
+    total = sum(len(caminhos) for caminhos in gerados)
+    print(f"{total} arquivo(s) em {args.saida} ({len(tarefas)} fatia(s), "
+          f"{time.perf_counter() - inicio:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import pandas as pd
+
+import dados
+import historico
+
+# Séries temporais da página de gráficos: VALOR NF, PESO e quantidade de NFs
+# no total e abertas por TERMINAL, TIPO DE CARGA e IMO. As linhas são somadas
+# por dia uma vez por versão dos dados e, a partir daí, por semana e por mês;
+# o gráfico só lê esses agregados (no máximo alguns milhares de pontos).
+# Intervalos longos sobem sozinhos de granularidade (dia -> semana -> mês)
+# para nenhuma série passar de MAX_PONTOS pontos.
+
+DIMENSOES = ['TERMINAL', 'TIPO DE CARGA', 'IMO']
+METRICAS = ['VALOR NF', 'PESO', 'NFs']
+GRANULARIDADES = {'Dia': 'D', 'Semana': 'W', 'Mês': 'M'}
+
+MAX_PONTOS = 400
+# Categorias além das maiores (por VALOR NF) viram OUTROS
+MAX_CATEGORIAS = 8
+OUTROS = 'OUTROS'
+VAZIO = '(em branco)'
+
+
+def diarios(df):
+    """{dimensão: somas por dia (e categoria)}; a chave None é o total."""
+    df = df[df['DATA'].notna().to_numpy()]
+    dia = df['DATA'].dt.normalize().rename('DATA')
+    valores = pd.DataFrame({
+        'VALOR NF': df['VALOR NF'].astype('float64') if 'VALOR NF' in df.columns else 0.0,
+        'PESO': df['PESO'].astype('float64') if 'PESO' in df.columns else 0.0,
+        'NFs': 1,
+    }, index=df.index)
+    resultado = {None: valores.groupby(dia).sum()}
+    for dim in DIMENSOES:
+        if dim not in df.columns:
+            continue
+        # Agrupa pelo categórico e só depois normaliza os rótulos (poucas linhas)
+        somas = valores.groupby([dia, df[dim]], observed=True, dropna=False).sum().reset_index()
+        categoria = somas[dim].astype(object).where(somas[dim].notna(), '').astype(str).str.strip()
+        somas[dim] = categoria.replace('', VAZIO)
+        resultado[dim] = somas.groupby(['DATA', dim]).sum()
+    return resultado
+
+
+def juntar(*partes):
+    """Soma dicionários de diarios() (ex.: dados vivos + histórico arquivado)."""
+    juntos = {}
+    for nome in partes[0]:
+        tabelas = [parte[nome] for parte in partes if nome in parte]
+        niveis = list(range(tabelas[0].index.nlevels))
+        juntos[nome] = pd.concat(tabelas).groupby(level=niveis).sum()
+    return juntos
+
+
+def _limitar(diario, dim):
+    totais = diario['VALOR NF'].groupby(level=dim).sum()
+    if len(totais) <= MAX_CATEGORIAS + 1:
+        return diario
+    maiores = totais.nlargest(MAX_CATEGORIAS).index
+    categorias = diario.index.get_level_values(dim)
+    categorias = categorias.where(categorias.isin(maiores), OUTROS)
+    return diario.groupby([diario.index.get_level_values('DATA'), categorias]).sum()
+
+
+def _agrupar(diario, freq):
+    if freq == 'D':
+        return diario
+    dias = diario.index.get_level_values('DATA')
+    chaves = [pd.DatetimeIndex(dias).to_period(freq).to_timestamp().rename('DATA')]
+    chaves += [diario.index.get_level_values(i) for i in range(1, diario.index.nlevels)]
+    return diario.groupby(chaves).sum()
+
+
+class SeriesTemporais:
+    def __init__(self, diarios):
+        self.diarios = diarios
+        self.agregados = {}
+        for dim, diario in diarios.items():
+            if dim is not None:
+                diario = _limitar(diario, dim)
+            for nome, freq in GRANULARIDADES.items():
+                self.agregados[(dim, nome)] = _agrupar(diario, freq)
+
+    @classmethod
+    def de_df(cls, df):
+        return cls(diarios(df))
+
+    def limites(self):
+        dias = self.agregados[(None, 'Dia')].index
+        if not len(dias):
+            return None
+        return dias[0].date(), dias[-1].date()
+
+    def _agregado(self, dim, granularidade, inicio=None, fim=None):
+        if inicio is None and fim is None:
+            return self.agregados[(dim, granularidade)]
+        # Com período: reagrupa só os dias do intervalo (as pontas ficam exatas)
+        diario = self.agregados[(dim, 'Dia')]
+        dias = diario.index.get_level_values('DATA')
+        selecao = (dias >= (inicio or pd.Timestamp.min)) & (dias < (fim or pd.Timestamp.max))
+        return _agrupar(diario[selecao], GRANULARIDADES[granularidade])
+
+    def serie(self, dim, metrica, granularidade=None, inicio=None, fim=None):
+        """(tabela DATA x categoria para o gráfico, granularidade usada).
+
+        granularidade é a mais fina aceita; None escolhe sozinha. Se passar de
+        MAX_PONTOS pontos, sobe para a seguinte.
+        """
+        nomes = list(GRANULARIDADES)
+        for nome in nomes[nomes.index(granularidade) if granularidade else 0:]:
+            agregado = self._agregado(dim, nome, inicio, fim)
+            if agregado.index.get_level_values('DATA').nunique() <= MAX_PONTOS:
+                break
+        valores = agregado[metrica]
+        if dim is None:
+            return valores.to_frame(), nome
+        return valores.unstack(dim, fill_value=0), nome
+
+
+def series_pagina(df, com_historico=False):
+    """Séries da versão atual dos dados, com ou sem o histórico arquivado."""
+    vivas = dados.derivado(df, 'series', SeriesTemporais.de_df)
+    if not com_historico:
+        return vivas
+
+    def com_arquivados(df):
+        arquivados = historico.ler_historico()
+        if arquivados is None:
+            return vivas
+        hashes = dados.derivado(
+            df, 'hashes_linhas', lambda d: historico.hash_linhas(d, list(d.columns)))
+        arquivados = historico.sem_repetidas(arquivados, df, hashes)
+        return SeriesTemporais(juntar(vivas.diarios, diarios(arquivados)))
+
+    # Partição regravada (novo arquivamento) muda a chave e remonta as séries
+    return dados.derivado(df, 'series_historico', com_arquivados, chave=historico.assinatura())
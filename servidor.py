@@ -0,0 +1,37 @@
+import asyncio
+import contextlib
+import logging
+import time
+
+import streamlit as st
+
+import aquecimento
+import config
+
+logger = logging.getLogger(__name__)
+
+# Ponto de entrada em produção:
+#
+#   streamlit run servidor.py
+#
+# Serve as mesmas páginas de main.py, mas aquece o processo (aquecimento.py)
+# antes de aceitar conexões: a primeira visita depois de um deploy já
+# encontra a planilha autenticada, os dados em memória e os índices montados.
+# Se o aquecimento passar de config.AQUECER_ESPERA segundos o servidor sobe
+# assim mesmo e o resto termina em segundo plano.
+
+
+@contextlib.asynccontextmanager
+async def partida(app):
+    inicio = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.to_thread(aquecimento.aquecer), config.AQUECER_ESPERA)
+    except asyncio.TimeoutError:
+        logger.warning("Aquecimento passou de %.0fs; continua em segundo plano",
+                       config.AQUECER_ESPERA)
+    else:
+        logger.info("Aquecimento concluído em %.1fs", time.perf_counter() - inicio)
+    yield
+
+
+app = st.App("main.py", lifespan=partida)
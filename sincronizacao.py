@@ -0,0 +1,132 @@
+import pandas as pd
+
+import config
+from fontes import faixas_contiguas
+
+# Sincronização incremental da aba Sertranding: em vez de baixar a planilha
+# inteira, busca só as linhas novas no fim da aba e as linhas cuja coluna
+# sentinela (STATUS) mudou desde a última leitura. Tudo é lido por coluna,
+# só nas colunas que o DataFrame usa. A coluna chave (PROCESSO) vem junto:
+# uma linha inserida ou apagada no meio da aba desloca a chave de todas as
+# linhas abaixo, e aí só a leitura completa acerta os números de linha.
+
+LOTE_NOVAS_LINHAS = 2000
+# Acima dessa fração de linhas alteradas sai mais barato recarregar tudo
+LIMITE_ALTERADAS = 0.2
+
+
+def hash_linhas(bruto):
+    return dict(zip(bruto.index, pd.util.hash_pandas_object(bruto.astype(object), index=False)))
+
+
+def linha_vazia(linha):
+    return not any(cell.strip() for cell in linha)
+
+
+class EstadoSync:
+    def __init__(self, grade, bruto, sentinela='STATUS', chave='PROCESSO'):
+        """grade: GradeColunar da última leitura completa; bruto: suas linhas não vazias, como texto."""
+        self.linha_cabecalho = grade.linha_cabecalho
+        self.nomes = list(grade.nomes)
+        self.letras = list(grade.letras)
+        self.ultima_linha = int(bruto.index.max()) if len(bruto) else grade.linha_cabecalho
+        self.hashes = hash_linhas(bruto)
+        self.sentinela = sentinela if sentinela in self.nomes else None
+        self.valores_sentinela = (dict(zip(bruto.index, bruto[sentinela]))
+                                  if self.sentinela else {})
+        self.chave = chave if chave in self.nomes else None
+        self.valores_chave = dict(zip(bruto.index, bruto[chave])) if self.chave else {}
+        self.syncs = 0
+        # Linhas (rótulos) aplicadas no último sync, para os índices se atualizarem
+        self.alteradas = None
+        # Células ilegíveis das linhas atuais (ver qualidade.py)
+        self.problemas = None
+
+    def registrar(self, bruto):
+        self.hashes.update(hash_linhas(bruto))
+        if self.sentinela:
+            self.valores_sentinela.update(zip(bruto.index, bruto[self.sentinela]))
+        if self.chave:
+            self.valores_chave.update(zip(bruto.index, bruto[self.chave]))
+        if len(bruto):
+            self.ultima_linha = max(self.ultima_linha, int(bruto.index.max()))
+
+
+def _coluna(bloco, tamanho):
+    valores = [str(v) for v in bloco[0]] if bloco else []
+    return valores[:tamanho] + [''] * (tamanho - len(valores))
+
+
+def _linhas(blocos, inicio, tamanho):
+    colunas = [_coluna(bloco, tamanho) for bloco in blocos]
+    return {n: list(valores) for n, valores in enumerate(zip(*colunas), inicio)}
+
+
+def buscar_alteracoes(fonte, estado):
+    """Devolve um DataFrame de texto com as linhas novas ou alteradas (índice = linha
+    da aba; linhas esvaziadas vêm em branco), ou None quando é preciso recarregar tudo."""
+    estado.syncs += 1
+    if estado.syncs >= config.SYNC_COMPLETO_A_CADA:
+        return None
+
+    cab = estado.linha_cabecalho
+    ultima = estado.ultima_linha
+    largura = len(estado.letras)
+
+    def faixas_linhas(inicio, fim):
+        return [f"{letra}{inicio}:{letra}{fim}" for letra in estado.letras]
+
+    # Cabeçalho, começo do rabo da aba e colunas sentinela e chave numa única
+    # chamada (aba só com o cabeçalho: não há linhas para conferir)
+    faixas = faixas_linhas(cab, cab) + faixas_linhas(ultima + 1, ultima + LOTE_NOVAS_LINHAS)
+    conferidas = [nome for nome in (estado.sentinela, estado.chave) if nome] if ultima > cab else []
+    for nome in conferidas:
+        letra = estado.letras[estado.nomes.index(nome)]
+        faixas.append(f"{letra}{cab + 1}:{letra}{ultima}")
+    resposta = fonte.ler_faixas(faixas, colunas=True)
+    conferencia = dict(zip(conferidas, resposta[2 * largura:]))
+
+    if [_coluna(bloco, 1)[0] for bloco in resposta[:largura]] != estado.nomes:
+        return None
+    if estado.chave in conferencia:
+        valores = _coluna(conferencia[estado.chave], ultima - cab)
+        if any(v != estado.valores_chave.get(n, '') for n, v in enumerate(valores, cab + 1)):
+            return None
+
+    linhas = {}
+    inicio = ultima + 1
+    blocos = resposta[largura:2 * largura]
+    while True:
+        tamanho = max((len(bloco[0]) if bloco else 0) for bloco in blocos)
+        linhas.update({n: linha for n, linha in _linhas(blocos, inicio, tamanho).items()
+                       if not linha_vazia(linha)})
+        if tamanho < LOTE_NOVAS_LINHAS:
+            break
+        inicio += LOTE_NOVAS_LINHAS
+        blocos = fonte.ler_faixas(faixas_linhas(inicio, inicio + LOTE_NOVAS_LINHAS - 1),
+                                  colunas=True)
+
+    if estado.sentinela in conferencia:
+        valores = _coluna(conferencia[estado.sentinela], ultima - cab)
+        alteradas = [n for n, v in enumerate(valores, cab + 1)
+                     if v != estado.valores_sentinela.get(n, '')]
+        if len(alteradas) > LIMITE_ALTERADAS * max(ultima - cab, 1):
+            return None
+        if alteradas:
+            # Todas as faixas alteradas, coluna por coluna, numa chamada só
+            faixas = faixas_contiguas(alteradas)
+            blocos = fonte.ler_faixas(
+                [f for a, b in faixas for f in faixas_linhas(a, b)], colunas=True)
+            for i, (a, b) in enumerate(faixas):
+                linhas.update(_linhas(blocos[i * largura:(i + 1) * largura], a, b - a + 1))
+
+    if not linhas:
+        return pd.DataFrame(columns=estado.nomes, dtype=object)
+    bruto = pd.DataFrame.from_dict(linhas, orient='index', columns=estado.nomes,
+                                   dtype=object)
+    bruto.index.name = 'LINHA'
+    # Descarta linhas que foram reescritas com o mesmo conteúdo
+    hashes = hash_linhas(bruto)
+    bruto = bruto[[estado.hashes.get(n) != h for n, h in hashes.items()]]
+    estado.registrar(bruto)
+    return bruto
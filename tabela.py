@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import dados
+from formatacao import formatar_moeda, formatar_peso
+from instrumentacao import etapa
+
+# Tabela de lançamentos paginada no servidor: ordenação e filtro rodam nas
+# colunas cruas e só a página visível ganha emojis e formatação pt-BR antes
+# de ir para o navegador.
+
+COLUNAS = ['STATUS_EMOJI', 'DATA', 'Nº DI', 'PROCESSO', 'PO', 'TERMINAL',
+           'TIPO DE CARGA', 'Nº CONTAINER', 'PRODUTO', 'QTD[VOLUME]', 'MOTORISTA',
+           'PESO', 'IMO_EMOJI', 'DAST', 'NOTA FISCAL', 'VALOR NF']
+
+TAMANHOS_PAGINA = [50, 100, 500]
+
+COLUNAS_CONFIG = {
+    "STATUS_EMOJI": st.column_config.TextColumn("STATUS"),
+    "IMO_EMOJI": st.column_config.TextColumn("IMO"),
+    "DATA": st.column_config.DateColumn("DATA", format="DD/MM/YYYY"),
+    "VALOR NF": st.column_config.TextColumn("VALOR NF"),
+    "PESO": st.column_config.TextColumn("PESO"),
+}
+
+
+def status_com_emoji(s):
+    s = str(s).upper()
+    if s == "CONCLUÍDO":
+        return "✅ CONCLUÍDO"
+    if s == "AGUARDANDO":
+        return "🟡 AGUARDANDO"
+    if s == "CANCELADO":
+        return "❌ CANCELADO"
+    return s
+
+
+def status_imo(s):
+    if s == "SIM":
+        return "☣️ SIM"
+    if s == "NÃO":
+        return "🟢 NÃO"
+    return s
+
+
+class OrdemColunas:
+    """Posições do df ordenadas por coluna, calculadas na primeira vez que a coluna é pedida."""
+
+    def __init__(self, df):
+        self.df = df
+        self.ordens = {}
+
+    def ordem(self, coluna, decrescente=False):
+        chave = (coluna, decrescente)
+        if chave not in self.ordens:
+            serie = self.df[coluna].reset_index(drop=True)
+            self.ordens[chave] = serie.sort_values(
+                ascending=not decrescente, kind='stable', na_position='last').index.to_numpy()
+        return self.ordens[chave]
+
+
+def posicoes(df, linhas, coluna=None, decrescente=False):
+    """Posições (iloc) das linhas filtradas, na ordem pedida."""
+    if coluna is None:
+        return np.arange(len(df)) if linhas is None else linhas
+    ordem = dados.derivado(df, 'ordem', OrdemColunas).ordem(coluna, decrescente)
+    if linhas is None:
+        return ordem
+    # Reaproveita a ordem do df inteiro: basta manter quem passou no filtro
+    mascara = np.zeros(len(df), dtype=bool)
+    mascara[linhas] = True
+    return ordem[mascara[ordem]]
+
+
+def formatar_pagina(pagina):
+    return pagina.assign(**{
+        "STATUS_EMOJI": pagina["STATUS"].map(status_com_emoji),
+        "IMO_EMOJI": pagina["IMO"].map(status_imo),
+        "PESO": formatar_peso(pagina["PESO"]),
+        "VALOR NF": formatar_moeda(pagina["VALOR NF"]),
+    })[COLUNAS]
+
+
+@st.fragment
+def tabela_paginada(df, linhas=None, chave='tabela'):
+    total = len(df) if linhas is None else len(linhas)
+    ordenaveis = [c for c in COLUNAS if c in df.columns]
+
+    c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+    coluna = c1.selectbox("Ordenar por", ['(ordem da planilha)'] + ordenaveis,
+                          key=f"{chave}_ordem")
+    decrescente = c2.toggle("Decrescente", key=f"{chave}_decrescente")
+    por_pagina = c3.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1,
+                              key=f"{chave}_tamanho")
+    paginas = max((total - 1) // por_pagina + 1, 1)
+    pagina = c4.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas,
+                             value=1, key=f"{chave}_pagina")
+
+    if coluna not in df.columns:
+        coluna = None
+    ordem = posicoes(df, linhas, coluna, decrescente)
+    if coluna is None and decrescente:
+        ordem = ordem[::-1]
+
+    inicio = (pagina - 1) * por_pagina
+    with etapa('tabela_formatar') as medicao:
+        visiveis = df.iloc[ordem[inicio:inicio + por_pagina]]
+        exibicao = medicao.df(formatar_pagina(visiveis))
+        exibicao.index = pd.RangeIndex(inicio, inicio + len(exibicao))
+
+    # Serialização para Arrow e envio ao navegador
+    with etapa('tabela_envio'):
+        st.dataframe(
+            exibicao,
+            width="stretch",
+            column_config=COLUNAS_CONFIG,
+        )
+    if total:
+        st.caption(f"{inicio + 1}–{inicio + len(exibicao)} de {total} lançamentos")
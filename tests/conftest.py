@@ -0,0 +1,39 @@
+import logging
+import os
+import sys
+
+import pytest
+
+# Os módulos do app ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sem worker em segundo plano nem arquivo de métricas durante os testes
+os.environ.setdefault('SERTRANDING_POLL_ATIVO', '0')
+os.environ.setdefault('SERTRANDING_METRICAS', '')
+# Fora do `streamlit run` os caches avisam a cada chamada
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+
+@pytest.fixture
+def planilha(monkeypatch):
+    """Liga dados/fontes a uma AbaFalsa; devolve uma função que recebe as linhas da aba."""
+    import dados
+    import fontes
+    from cliente_sheets import ClienteSheets
+
+    def ligar(linhas):
+        from falsos import AbaFalsa
+
+        aba = AbaFalsa(linhas)
+        fonte = fontes.FonteGoogleSheets()
+        cliente = ClienteSheets(lambda: aba, por_minuto=6000, tentativas=1, espera_base=0)
+        monkeypatch.setattr(fontes, 'fonte_configurada', lambda: fonte)
+        monkeypatch.setattr(fontes, 'cliente_planilha', lambda: cliente)
+        return aba
+
+    # Cada teste começa sem dados em memória e sem snapshot
+    dados.cache_dados.clear()
+    monkeypatch.setattr(dados, 'ler_snapshot', lambda *args, **kwargs: (None, None))
+    monkeypatch.setattr(dados, '_gravar_snapshot', lambda *args, **kwargs: None)
+    yield ligar
+    dados.cache_dados.clear()
@@ -0,0 +1,132 @@
+import random
+import re
+
+import pygsheets.address
+
+from fontes import numero_coluna
+
+# Aba do Google Sheets em memória, com o comportamento do pygsheets/da API que
+# a sincronização e a escrita usam: leitura em lote por faixa A1 (por linha ou
+# por coluna, sem as células vazias do fim), values.batchUpdate e append com
+# INSERT_ROWS (procura o fim da tabela a partir da faixa e insere logo abaixo,
+# empurrando as linhas seguintes) e batchUpdate com deleteDimension.
+
+COLUNAS = ['STATUS', 'DATA', 'Nº DI', 'PROCESSO', 'PO', '', 'TERMINAL', 'TIPO DE CARGA',
+           'Nº CONTAINER', 'PRODUTO', 'QTD[VOLUME]', 'MOTORISTA', 'PESO', 'IMO', 'DAST',
+           'NOTA FISCAL', 'VALOR NF']
+
+
+def grade(n, semente=1, vazias_a_cada=None):
+    """Cabeçalho + n lançamentos (PROCESSO PRC-0, PRC-1...), como texto da planilha."""
+    g = random.Random(semente)
+    linhas = [list(COLUNAS)]
+    for i in range(n):
+        linhas.append([
+            g.choice(['CONCLUÍDO', 'AGUARDANDO', 'CANCELADO']), f"{g.randint(1, 28):02d}/05/2026",
+            f"DI{i:06d}", f"PRC-{i}", f"PO{i % 97}", '', g.choice(['TECON', 'DPW']),
+            g.choice(['SECA', 'REEFER']), f"MSCU{g.randint(1000000, 9999999)}", 'CAFÉ',
+            str(g.randint(1, 40)), 'JOÃO', f"{g.randint(100, 999)} kg", 'NÃO', 'x',
+            str(1000 + i), f"R$ {g.randint(100, 999)},50",
+        ])
+        if vazias_a_cada and (i + 1) % vazias_a_cada == 0:
+            linhas.append([''] * len(COLUNAS))
+    return linhas
+
+
+def _vazia(linha):
+    return not any(str(c).strip() for c in linha)
+
+
+class PlanilhaFalsa:
+    def __init__(self, aba):
+        self.aba = aba
+
+    def custom_request(self, requisicoes, fields=None):
+        self.aba.chamadas.append(('batchUpdate', len(requisicoes)))
+        for requisicao in requisicoes:
+            faixa = requisicao['deleteDimension']['range']
+            assert faixa['sheetId'] == self.aba.id and faixa['dimension'] == 'ROWS'
+            del self.aba.linhas[faixa['startIndex']:faixa['endIndex']]
+        return {'replies': [{} for _ in requisicoes]}
+
+
+class AbaFalsa:
+    id = 0
+
+    def __init__(self, linhas):
+        self.linhas = [list(linha) for linha in linhas]
+        self.chamadas = []
+        self.spreadsheet = PlanilhaFalsa(self)
+
+    @property
+    def largura(self):
+        return len(self.linhas[0])
+
+    def _faixa(self, a1):
+        m = re.fullmatch(r'([A-Z]+)(\d+):([A-Z]+)(\d+)', a1)
+        if m:
+            c1, l1, c2, l2 = numero_coluna(m[1]), int(m[2]), numero_coluna(m[3]), int(m[4])
+        elif re.fullmatch(r'[A-Z]+:[A-Z]+', a1):
+            a, b = a1.split(':')
+            c1, c2, l1, l2 = numero_coluna(a), numero_coluna(b), 1, len(self.linhas)
+        else:
+            a, b = a1.split(':')
+            c1, c2, l1, l2 = 1, self.largura, int(a), int(b)
+        # O GridRange do pygsheets recusa faixas invertidas
+        assert l1 <= l2 and c1 <= c2, a1
+        return c1, l1, c2, l2
+
+    def get_all_values(self, **kwargs):
+        self.chamadas.append(('all',))
+        return [list(linha) for linha in self.linhas]
+
+    def get_values_batch(self, faixas, majdim='ROWS', **kwargs):
+        self.chamadas.append(('leitura', len(faixas)))
+        blocos = []
+        for a1 in faixas:
+            c1, l1, c2, l2 = self._faixa(a1)
+            bloco = [linha[c1 - 1:c2] for linha in self.linhas[l1 - 1:l2]]
+            if majdim == 'COLUMNS':
+                bloco = [list(coluna) for coluna in zip(*bloco)]
+            for parte in bloco:
+                while parte and parte[-1] == '':
+                    parte.pop()
+            while bloco and not bloco[-1]:
+                bloco.pop()
+            blocos.append(bloco or [['']])
+        return blocos
+
+    def update_values_batch(self, faixas, valores, **kwargs):
+        self.chamadas.append(('update', len(faixas)))
+        for a1, bloco in zip(faixas, valores):
+            c1, l1, _, _ = self._faixa(a1)
+            for i, linha in enumerate(bloco):
+                for j, valor in enumerate(linha):
+                    self.linhas[l1 - 1 + i][c1 - 1 + j] = valor
+
+    def append_table(self, valores, start='A1', **kwargs):
+        self.chamadas.append(('append', len(valores)))
+        inicio = int(re.fullmatch(r'[A-Z]+(\d+)', start)[1])
+        # Fim da tabela: a primeira linha vazia a partir de start
+        fim = inicio
+        while fim <= len(self.linhas) and not _vazia(self.linhas[fim - 1]):
+            fim += 1
+        novas = [list(v) + [''] * (self.largura - len(v)) for v in valores]
+        self.linhas[fim - 1:fim - 1] = novas
+        faixa = f"Sertranding!A{fim}:Q{fim + len(valores) - 1}"
+        return {'updates': {'updatedRange': pygsheets.address.GridRange(label=faixa)}}
+
+    # Edições feitas por outras pessoas direto na planilha
+
+    def apagar(self, *numeros):
+        for n in sorted(numeros, reverse=True):
+            del self.linhas[n - 1]
+
+    def processo(self, n):
+        return self.linhas[n - 1][COLUNAS.index('PROCESSO')]
+
+    def status(self, n):
+        return self.linhas[n - 1][COLUNAS.index('STATUS')]
+
+    def linha_do_processo(self, processo):
+        return [linha[COLUNAS.index('PROCESSO')] for linha in self.linhas].index(processo) + 1
@@ -0,0 +1,37 @@
+import time
+
+import config
+import dados
+from atualizador import Atualizador
+from falsos import grade
+
+
+def test_snapshot_vencido_e_buscado_na_partida(planilha):
+    aba = planilha(grade(30))
+    df, _ = dados.ler_planilha()
+    # Partida a frio com um snapshot de dois dias atrás
+    dados.cache_dados().publicar(df, time.time() - 2 * 86400)
+    aba.linhas[1][0] = 'CANCELADO' if aba.linhas[1][0] != 'CANCELADO' else 'AGUARDANDO'
+
+    atualizador = Atualizador(intervalo=3600, intervalo_maximo=3600)
+    assert atualizador.primeira_espera() == 0
+    atualizador.iniciar()
+    try:
+        limite = time.time() + 10
+        while atualizador.ultima_busca is None and time.time() < limite:
+            time.sleep(0.01)
+    finally:
+        atualizador.parar()
+
+    assert atualizador.ultima_busca is not None
+    assert not dados.cache_dados().expirado()
+    assert dados.cache_dados().df['STATUS'].iloc[0] == aba.linhas[1][0]
+
+
+def test_dados_frescos_esperam_vencer(planilha):
+    planilha(grade(5))
+    dados.carregar_dados()
+
+    espera = Atualizador(intervalo=3600, intervalo_maximo=3600).primeira_espera()
+
+    assert config.CACHE_TTL - 5 < espera <= config.CACHE_TTL
@@ -0,0 +1,31 @@
+import numpy as np
+
+import dados
+from busca import IndiceBusca
+from falsos import COLUNAS, grade
+
+
+def test_indice_atualizado_igual_ao_remontado(planilha):
+    aba = planilha(grade(200, vazias_a_cada=40))
+    df, estado = dados.ler_planilha()
+    indice = IndiceBusca(df)
+    # Só STATUS (fora da busca) numa linha; STATUS e Nº DI noutra (o sync
+    # relê as linhas cujo STATUS mudou); e uma linha nova no fim
+    status = COLUNAS.index('STATUS')
+    for n in (10, 120):
+        aba.linhas[n][status] = 'CANCELADO' if aba.linhas[n][status] != 'CANCELADO' else 'AGUARDANDO'
+    aba.linhas[120][COLUNAS.index('Nº DI')] = 'DI-ÁBCXYZ'
+    aba.linhas.append(list(aba.linhas[5]))
+    aba.linhas[-1][COLUNAS.index('PROCESSO')] = 'PRC-NOVO'
+
+    novo = dados.sincronizar(df, estado)
+    assert novo is not None and len(estado.alteradas) == 3
+    atualizado = indice.atualizar(novo, estado.alteradas)
+
+    remontado = IndiceBusca(novo)
+    np.testing.assert_array_equal(atualizado.chaves, remontado.chaves)
+    np.testing.assert_array_equal(atualizado.rotulos, remontado.rotulos)
+    assert atualizado.texto.equals(remontado.texto)
+    assert novo.index[atualizado.buscar('abcxyz')].tolist() == [121]
+    assert novo.index[atualizado.buscar('prc-novo')].tolist() == [len(aba.linhas)]
+    assert len(atualizado.buscar(aba.linhas[121][COLUNAS.index('Nº DI')])) == 1
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from cliente_sheets import BaldeTokens, ClienteSheets
+
+
+class ErroApi(Exception):
+    """Como o HttpError do googleapiclient: o status HTTP em resp.status."""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type('Resposta', (), {'status': status})()
+
+
+class AbaInstavel:
+    """Aba que falha com os erros dados, em ordem, antes de responder."""
+
+    def __init__(self, erros=(), demora=0):
+        self.erros = list(erros)
+        self.demora = demora
+        self.chamadas = []
+
+    def _chamar(self, nome, resposta):
+        self.chamadas.append(nome)
+        time.sleep(self.demora)
+        if self.erros:
+            raise ErroApi(self.erros.pop(0))
+        return resposta
+
+    def get_values_batch(self, faixas, majdim='ROWS'):
+        return self._chamar('leitura', [[['x']] for _ in faixas])
+
+    def append_table(self, valores, start='A1'):
+        return self._chamar('append', {'updates': {}})
+
+
+def _cliente(aba, tentativas=4):
+    return ClienteSheets(lambda: aba, por_minuto=6000, tentativas=tentativas, espera_base=0)
+
+
+def test_leitura_repetida_depois_de_cota_e_erro_de_servidor():
+    aba = AbaInstavel([429, 503])
+
+    assert _cliente(aba).get_values_batch(['A1:A2']) == [[['x']]]
+    assert aba.chamadas == ['leitura'] * 3
+
+
+def test_leitura_desiste_depois_das_tentativas():
+    aba = AbaInstavel([500] * 5)
+
+    with pytest.raises(ErroApi):
+        _cliente(aba, tentativas=3).get_values_batch(['A1:A2'])
+    assert len(aba.chamadas) == 3
+
+
+def test_erro_permanente_nao_e_repetido():
+    aba = AbaInstavel([403])
+
+    with pytest.raises(ErroApi):
+        _cliente(aba).get_values_batch(['A1:A2'])
+    assert len(aba.chamadas) == 1
+
+
+def test_append_so_e_repetido_por_cota():
+    # 500 no append: a linha pode ter entrado; repetir duplicaria
+    aba = AbaInstavel([500])
+    with pytest.raises(ErroApi):
+        _cliente(aba).append_table([['a']], 'A2')
+    assert aba.chamadas == ['append']
+
+    aba = AbaInstavel([429])
+    assert _cliente(aba).append_table([['a']], 'A2') == {'updates': {}}
+    assert aba.chamadas == ['append'] * 2
+
+
+def _simultaneas(cliente, n=2):
+    resultados, erros = [], []
+    pronto = threading.Barrier(n)
+
+    def ler():
+        pronto.wait()
+        try:
+            resultados.append(cliente.get_values_batch(['A1:A2'], majdim='COLUMNS'))
+        except Exception as erro:
+            erros.append(erro)
+
+    threads = [threading.Thread(target=ler) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resultados, erros
+
+
+def test_leituras_simultaneas_viram_uma_chamada():
+    aba = AbaInstavel(demora=0.2)
+
+    resultados, erros = _simultaneas(_cliente(aba))
+
+    assert erros == [] and resultados == [[[['x']]]] * 2
+    assert aba.chamadas == ['leitura']
+
+
+def test_leituras_simultaneas_recebem_o_mesmo_erro():
+    aba = AbaInstavel([403], demora=0.2)
+
+    resultados, erros = _simultaneas(_cliente(aba))
+
+    assert resultados == [] and len(erros) == 2 and erros[0] is erros[1]
+    assert aba.chamadas == ['leitura']
+
+
+def test_balde_limita_as_chamadas_por_minuto():
+    # 600/min = 10/s, com capacidade para 2 de uma vez
+    balde = BaldeTokens(600, capacidade=2)
+    inicio = time.monotonic()
+    for _ in range(5):
+        balde.consumir()
+
+    # As 3 depois da rajada esperam 0,1s cada
+    assert time.monotonic() - inicio >= 0.28
@@ -0,0 +1,128 @@
+import pandas as pd
+
+import config
+import dados
+import escrita
+from falsos import grade
+
+
+def _fila():
+    # Sem timer: cada teste chama enviar() quando quer
+    return escrita.FilaEscrita(espera=3600, espera_falha=3600)
+
+
+def _gravacoes(aba):
+    return [chamada[0] for chamada in aba.chamadas if chamada[0] in ('update', 'append')]
+
+
+def _aguardando(linhas):
+    for linha in linhas[1:]:
+        linha[0] = 'AGUARDANDO'
+    return linhas
+
+
+def _leitura_completa(aba):
+    return dados.montar_dataframe(aba.linhas)[config.COLUNAS]
+
+
+def test_alteracoes_aparecem_na_hora_e_vao_num_envio_so(planilha):
+    aba = planilha(grade(100, vazias_a_cada=30))
+    df = dados.carregar_dados()
+    versao = dados.cache_dados().versao
+    fila = _fila()
+    alvo = df.index[[3, 4, 60]]
+
+    fila.trocar_status(pd.Series('CANCELADO', index=alvo))
+    fila.incluir([{'STATUS': 'AGUARDANDO', 'DATA': '01/02/2026', 'PROCESSO': 'PRC-NOVO-1'},
+                  {'STATUS': 'AGUARDANDO', 'DATA': '02/02/2026', 'PROCESSO': 'PRC-NOVO-2'}])
+
+    # Todas as sessões já veem as alterações; a planilha ainda não recebeu nada
+    atual = dados.cache_dados().df
+    assert dados.cache_dados().versao == versao + 2
+    assert atual.loc[alvo, 'STATUS'].tolist() == ['CANCELADO'] * 3
+    assert atual['PROCESSO'].iloc[-2:].tolist() == ['PRC-NOVO-1', 'PRC-NOVO-2']
+    assert _gravacoes(aba) == []
+    assert fila.pendentes() == 5
+
+    fila.enviar()
+
+    assert _gravacoes(aba) == ['update', 'append']
+    assert [aba.status(n) for n in alvo] == ['CANCELADO'] * 3
+    assert fila.pendentes() == 0 and fila.falha is None
+    pd.testing.assert_frame_equal(dados.cache_dados().df, _leitura_completa(aba),
+                                  check_categorical=False)
+
+
+def test_linhas_novas_ganham_o_numero_real(planilha):
+    aba = planilha(grade(50))
+    dados.carregar_dados()
+    fila = _fila()
+    fila.incluir([{'STATUS': 'AGUARDANDO', 'DATA': '01/02/2026', 'PROCESSO': 'PRC-NOVO'}])
+    # Outra pessoa inclui uma linha direto na planilha antes do envio
+    aba.linhas.append(list(aba.linhas[1]))
+    aba.linhas[-1][3] = 'PRC-OUTRO'
+
+    fila.enviar()
+
+    linha = aba.linha_do_processo('PRC-NOVO')
+    assert linha == len(aba.linhas)
+    assert dados.cache_dados().df.loc[linha, 'PROCESSO'] == 'PRC-NOVO'
+
+
+def test_status_nao_vai_para_a_linha_errada(planilha):
+    aba = planilha(_aguardando(grade(100)))
+    df = dados.carregar_dados()
+    fila = _fila()
+    alvo = int(df.index[50])
+    processo = df.loc[alvo, 'PROCESSO']
+    fila.trocar_status(pd.Series('CANCELADO', index=[alvo]))
+    # Uma linha acima é apagada: o lançamento sobe uma linha
+    aba.apagar(10)
+    vizinho = aba.processo(alvo)
+
+    fila.enviar()
+
+    # A linha de antes (agora de outro PROCESSO) fica intacta; a aba foi relida
+    # e a troca refeita na linha nova do mesmo PROCESSO
+    assert aba.status(alvo) == 'AGUARDANDO'
+    assert dados.cache_dados().df.loc[alvo, 'PROCESSO'] == vizinho
+    nova = aba.linha_do_processo(processo)
+    assert nova == alvo - 1
+    assert dados.cache_dados().df.loc[nova, 'STATUS'] == 'CANCELADO'
+
+    fila.enviar()
+
+    assert aba.status(nova) == 'CANCELADO'
+    assert aba.status(alvo) == 'AGUARDANDO'
+    assert fila.pendentes() == 0 and fila.descartadas == 0
+
+
+def test_append_antes_do_fim_relê_a_aba(planilha):
+    aba = planilha(grade(40))
+    df = dados.carregar_dados()
+    fila = _fila()
+    fila.incluir([{'STATUS': 'AGUARDANDO', 'DATA': '01/02/2026', 'PROCESSO': 'PRC-NOVO'}])
+    # A última linha conhecida foi esvaziada: o append cai nela, não depois dela
+    ultima = int(df.index.max())
+    aba.linhas[ultima - 1] = [''] * aba.largura
+
+    fila.enviar()
+
+    assert aba.linha_do_processo('PRC-NOVO') == ultima
+    pd.testing.assert_frame_equal(dados.cache_dados().df, _leitura_completa(aba),
+                                  check_categorical=False)
+
+
+def test_inclusao_numa_aba_so_com_cabecalho(planilha):
+    aba = planilha(grade(0))
+    assert dados.carregar_dados().empty
+    fila = _fila()
+
+    fila.incluir([{'STATUS': 'AGUARDANDO', 'DATA': '01/02/2026', 'PROCESSO': 'PRC-NOVO'}])
+
+    assert dados.cache_dados().df.index.tolist() == [2]
+    fila.enviar()
+    assert aba.processo(2) == 'PRC-NOVO'
+    assert fila.pendentes() == 0 and fila.falha is None
+    pd.testing.assert_frame_equal(dados.cache_dados().df, _leitura_completa(aba),
+                                  check_categorical=False)
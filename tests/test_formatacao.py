@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from formatacao import parse_numero
+
+
+def test_parse_numero_mantem_o_indice():
+    serie = pd.Series(['R$ 1.234,56', '10,5', '7'], index=[5, 9, 12])
+    resultado = parse_numero(serie)
+    assert resultado.index.tolist() == [5, 9, 12]
+    assert resultado.tolist() == [1234.56, 10.5, 7.0]
+
+
+def test_parse_numero_lixo_nao_desloca_valores():
+    # Índice = linha da aba (não contíguo) e uma célula com lixo: cai no caminho do pandas
+    serie = pd.Series(['R$ 1.234,56', '12,3,4', '', 'R$ 99,00', '-'], index=[3, 4, 7, 8, 20])
+    resultado = parse_numero(serie)
+    assert resultado.index.tolist() == [3, 4, 7, 8, 20]
+    assert resultado[3] == 1234.56
+    assert np.isnan(resultado[4])
+    assert np.isnan(resultado[7])
+    assert resultado[8] == 99.0
+    assert np.isnan(resultado[20])
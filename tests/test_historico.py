@@ -0,0 +1,40 @@
+import dados
+import historico
+from falsos import grade
+
+
+def _concluidos(linhas):
+    for linha in linhas[1:]:
+        linha[0] = 'CONCLUÍDO'
+    return linhas
+
+
+def test_remove_so_as_linhas_que_conferem(planilha):
+    aba = planilha(_concluidos(grade(40)))
+    df, _ = dados.ler_planilha()
+    selecao = df.loc[[5, 6, 7, 20, 21, 30]]
+    # Depois da leitura: alguém apaga a linha 15 (tudo abaixo sobe uma linha)
+    # e reabre o lançamento da linha 6
+    aba.apagar(15)
+    aba.linhas[5][0] = 'AGUARDANDO'
+
+    removidas = historico.remover_da_planilha(selecao)
+
+    assert removidas == 2
+    processos = [linha[3] for linha in aba.linhas[1:]]
+    assert 'PRC-3' not in processos and 'PRC-5' not in processos
+    # A linha reaberta e as que subiram ficam na aba
+    assert {'PRC-4', 'PRC-18', 'PRC-19', 'PRC-20', 'PRC-28', 'PRC-29'} <= set(processos)
+    assert len(processos) == 40 - 1 - 2
+    assert [c for c in aba.chamadas if c[0] == 'batchUpdate'] == [('batchUpdate', 2)]
+
+
+def test_nada_confere_nada_e_apagado(planilha):
+    aba = planilha(_concluidos(grade(10)))
+    df, _ = dados.ler_planilha()
+    aba.linhas.insert(1, list(aba.linhas[1]))
+    aba.linhas[1][3] = 'PRC-INSERIDO'
+
+    assert historico.remover_da_planilha(df.loc[[3, 4]]) == 0
+    assert len(aba.linhas) == 12
+    assert not [c for c in aba.chamadas if c[0] == 'batchUpdate']
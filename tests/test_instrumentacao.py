@@ -0,0 +1,32 @@
+import os
+import threading
+
+import config
+from instrumentacao import Registro
+
+
+def test_sessoes_gravando_juntas_nao_falham(tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'metricas.prom')
+    monkeypatch.setattr(config, 'METRICAS_PATH', caminho)
+    monkeypatch.setattr(config, 'METRICAS_INTERVALO', -1)
+    registro = Registro()
+    registro.registrar('pagina', 0.1, linhas=10)
+    erros = []
+
+    def sessao():
+        try:
+            for _ in range(200):
+                registro.gravar_se_preciso()
+        except Exception as erro:
+            erros.append(erro)
+
+    sessoes = [threading.Thread(target=sessao) for _ in range(4)]
+    for t in sessoes:
+        t.start()
+    for t in sessoes:
+        t.join()
+
+    assert erros == []
+    assert not os.path.exists(f"{caminho}.tmp")
+    with open(caminho, encoding='utf-8') as arquivo:
+        assert 'sertranding_etapa_linhas{etapa="pagina"} 10' in arquivo.read()
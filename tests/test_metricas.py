@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+import dados
+from benchmark import gerar_grade
+from indice import IndiceDatas, IndiceFiltros
+from metricas import DIMENSOES, CuboMetricas, kpis_linhas
+
+
+@pytest.fixture(scope='module')
+def planilha_gerada():
+    df = dados.tipar(dados.montar_bruto(gerar_grade(5000, semente=3)))
+    return df, CuboMetricas(df), IndiceFiltros(df), IndiceDatas(df)
+
+
+def _sortear(gerador, opcoes):
+    return gerador.sample(opcoes, gerador.randint(0, min(3, len(opcoes))))
+
+
+@pytest.mark.parametrize('semente', range(20))
+def test_cubo_igual_as_linhas_filtradas(planilha_gerada, semente):
+    df, cubo, indice, datas = planilha_gerada
+    g = random.Random(semente)
+    filtros = {nome: _sortear(g, indice.opcoes[nome]) for nome in DIMENSOES}
+    meses = _sortear(g, list(datas.meses))
+
+    linhas = indice.linhas(filtros, datas.selecionar(meses))
+    esperado = kpis_linhas(df if linhas is None else df.iloc[linhas])
+
+    kpis = cubo.kpis(filtros, meses)
+    assert {k: kpis[k] for k in ('nfs', 'aguardando', 'concluidos')} == \
+        {k: esperado[k] for k in ('nfs', 'aguardando', 'concluidos')}
+    assert kpis['valor'] == pytest.approx(esperado['valor'])
+    assert kpis['peso'] == pytest.approx(esperado['peso'])
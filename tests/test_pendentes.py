@@ -0,0 +1,26 @@
+import pandas as pd
+
+import dados
+import pendentes
+from falsos import grade
+from instrumentacao import registro
+
+
+def _nomes_metricas():
+    return {nome for nome, _ in registro().cache} | set(registro().etapas)
+
+
+def test_pendentes_de_outro_dia_nao_criam_metrica_nova(planilha):
+    planilha(grade(60))
+    df = dados.carregar_dados()
+    antes = _nomes_metricas()
+
+    ontem = pendentes.pendentes_atuais(df, pd.Timestamp('2026-05-10'))
+    assert pendentes.pendentes_atuais(df, pd.Timestamp('2026-05-10')) is ontem
+    hoje = pendentes.pendentes_atuais(df, pd.Timestamp('2026-05-11'))
+
+    # Dia novo remonta no mesmo lugar, com o mesmo nome nas métricas
+    assert hoje is not ontem
+    assert list(dados.cache_dados().derivados) == ['pendentes']
+    novos = _nomes_metricas() - antes
+    assert novos <= {'pendentes', 'derivado_pendentes', 'derivado_datas', 'datas'}
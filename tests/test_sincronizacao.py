@@ -0,0 +1,73 @@
+import pandas as pd
+
+import config
+import dados
+import fontes
+import sincronizacao
+from falsos import grade
+
+
+def _leitura_completa(aba):
+    return dados.montar_dataframe(aba.linhas)[config.COLUNAS]
+
+
+def _concluidos(linhas):
+    # STATUS igual em todas as linhas: deslocar linhas não muda a sentinela
+    for linha in linhas[1:]:
+        linha[0] = 'CONCLUÍDO'
+    return linhas
+
+
+def test_sync_traz_status_alterado_e_linhas_novas(planilha):
+    aba = planilha(grade(300, vazias_a_cada=50))
+    df, estado = dados.ler_planilha()
+    aba.linhas[10][0] = 'CANCELADO' if aba.linhas[10][0] != 'CANCELADO' else 'AGUARDANDO'
+    aba.linhas.append(list(aba.linhas[5]))
+    aba.linhas[-1][3] = 'PRC-NOVO'
+
+    novo = dados.sincronizar(df, estado)
+
+    pd.testing.assert_frame_equal(novo, _leitura_completa(aba))
+
+
+def test_leitura_completa_depois_de_sync_nao_cria_versao(planilha):
+    aba = planilha(grade(100))
+    dados.carregar_dados()
+    aba.linhas[5][0] = 'CANCELADO' if aba.linhas[5][0] != 'CANCELADO' else 'AGUARDANDO'
+    dados.atualizar_dados()
+    versao = dados.cache_dados().versao
+
+    # Planilha igual: a leitura completa reaproveita o df do sync
+    dados.atualizar_dados(completo=True)
+
+    assert dados.cache_dados().versao == versao
+
+
+def test_linhas_apagadas_no_meio_pedem_leitura_completa(planilha):
+    # Como o historico.py --remover: 5 CONCLUÍDOS antigos somem do meio da aba
+    aba = planilha(_concluidos(grade(1000)))
+    df, estado = dados.ler_planilha()
+    aba.apagar(20, 150, 151, 400, 777)
+
+    assert sincronizacao.buscar_alteracoes(fontes.fonte_configurada(), estado) is None
+
+
+def test_linha_inserida_no_meio_pede_leitura_completa(planilha):
+    aba = planilha(_concluidos(grade(200)))
+    df, estado = dados.ler_planilha()
+    aba.linhas.insert(50, list(aba.linhas[49]))
+
+    assert sincronizacao.buscar_alteracoes(fontes.fonte_configurada(), estado) is None
+
+
+def test_aba_so_com_cabecalho(planilha):
+    aba = planilha(grade(0))
+    df, estado = dados.ler_planilha()
+    assert df.empty
+
+    # Sem linhas de dados não há faixa de conferência (A2:A1 seria inválida)
+    assert sincronizacao.buscar_alteracoes(fontes.fonte_configurada(), estado).empty
+
+    aba.linhas.append(list(grade(1)[1]))
+    novas = sincronizacao.buscar_alteracoes(fontes.fonte_configurada(), estado)
+    assert novas['PROCESSO'].tolist() == ['PRC-0']